@@ -5,9 +5,18 @@ Classes:
     AirbnbScrapper: Class responsible for scraping Airbnb listing pages
 
     ListingData: Class containing the data from an Airbnb listing
+
+    ListingCollection: Class containing Airbnb listings in a compact, columnar form
 """
 
-from .airbnb import AirbnbScrapper
-from .types import ListingData
+from .types import ListingData, ListingCollection
+
+__all__ = ["AirbnbScrapper", "ListingData", "ListingCollection"]
+
 
-__all__ = ["AirbnbScrapper", "ListingData"]
+def __getattr__(name: str):
+    """Imports the scrapper on first use, so the scrapping dependencies are only loaded when needed"""
+    if name == "AirbnbScrapper":
+        from .airbnb import AirbnbScrapper
+        return AirbnbScrapper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,15 @@
 import csv
 import logging
+import os
 import time
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from bs4 import BeautifulSoup
-from selenium.common import NoSuchElementException
-from selenium.webdriver.common.by import By
 
-from utilities import Scrapper, Browser
-from airbnb.types import ListingData
+from exceptions.files import ArchivedPageNotFound
+from exceptions.scrapping import SelectorHealthException
+from utilities import Scrapper, Browser, PageArchive
+from airbnb.types import ListingCollection
 from airbnb.vars import (
     AIRBNB_URL,
     CSS_NEXT_PAGE,
@@ -18,6 +19,11 @@ from airbnb.vars import (
     CSS_HOSTNAME,
     HOST_SELECTOR,
     CSV_HEADERS,
+    RESULTS_TAG,
+    RESULTS_PAGE_SIZE,
+    HEALTH_SAMPLE_SIZE,
+    SELECTOR_THRESHOLDS,
+    SELECTOR_ALTERNATIVES,
 )
 
 
@@ -30,19 +36,32 @@ class AirbnbScrapper(Scrapper):
         browser_name    (str): Name of the browser to use
         browser_args    (tuple): Arguments to pass to the browser when initialized
         browser         (WebDriver): Selenium driver
+        archive         (PageArchive): Archive where the fetched pages are recorded (optional)
+        replay          (bool): Whether the pages are read from the archive instead of the browser
         results         (List[BeautifulSoup]): List containing the raw airbnb pages
-        listings        (List[ListingData]): List containing the data of the listings
+        listings        (ListingCollection): Collection containing the data of the listings
     """
 
     logger = logging.getLogger("AirbnbScrapper")
 
-    def __init__(self, browser: Browser, arguments=("--headless", "--no-sandbox")) -> None:
+    def __init__(
+        self,
+        browser: Browser,
+        arguments=("--headless", "--no-sandbox"),
+        archive: PageArchive = None,
+        replay: bool = False,
+    ) -> None:
         # Browser
-        super().__init__(browser, arguments)
+        super().__init__(browser, arguments, archive=archive, replay=replay)
         # Pages
         self.results: List[BeautifulSoup] = []
         # Listings
-        self.listings: List[ListingData] = []
+        self.listings = ListingCollection()
+
+    def reset(self) -> None:
+        """Clears the pages and listings of previous extractions"""
+        self.results = []
+        self.listings = ListingCollection()
 
     def extract(self, url=AIRBNB_URL, filename: str = None, **kwargs) -> None:
         """
@@ -59,6 +78,9 @@ class AirbnbScrapper(Scrapper):
             - css_hostname: CSS classname of the hostname of a listing
             - css_permit: CSS classname of the tourism's lodging permit of a listing
             - csv_headers: Headers of the csv file
+            - health_check: Whether to check the selectors before the full crawl (True by default)
+            - page_size, sample_size, thresholds, alternatives: Options for the selectors check (see
+              'check_results_selectors' and 'check_listing_selectors')
         """
         # Arguments
         load_time = kwargs.get('load_time', 8)  # 8 is an arbitrary time (works well with 300Mbps connection)
@@ -71,21 +93,159 @@ class AirbnbScrapper(Scrapper):
         css_permit = kwargs.get('css_permit', CSS_PERMIT)
         csv_headers = kwargs.get('csv_headers', CSV_HEADERS)
 
+        # Fail before scrapping if there's nowhere to save the data
+        filename = filename if filename is not None else self._default_filename()
+        if self.archive is not None and not self.replay:
+            self.archive.start_crawl()  # Pages fetched after midnight still belong to today's crawl
+
+        # The selectors of the results are checked on the first page before paginating, and the selectors of the
+        # listings on a sample before visiting every listing
+        health_check = kwargs.get('health_check', True)
+        first_page = self.first_results_page(url, load_time)
+        if health_check:
+            selectors = self.check_results_selectors(first_page, **kwargs)
+            css_next_page = selectors['css_next_page']
+            css_listings = selectors['css_listings']
+            url_selector = selectors['url_selector']
+
         # Scrape
-        self.extract_soup(url, load_time, click_time, css_next_page)
+        self.extract_soup(url, load_time, click_time, css_next_page, first_page)
         self.scrape_listings_links(css_listings, url_selector)
+        if health_check:
+            selectors = self.check_listing_selectors(self.listings, **kwargs)
+            host_selector = selectors['host_selector']
+            css_hostname = selectors['css_hostname']
+            css_permit = selectors['css_permit']
         self.extract_listing_data(load_time, host_selector, css_hostname, css_permit)
         self.to_csv(csv_headers, filename)
 
-    def extract_soup(self, url: str, load_time: int, click_time: int, css_next_page: str) -> None:
+    def check_selectors(self, url=AIRBNB_URL, page: BeautifulSoup = None, **kwargs) -> Dict:
+        """
+        Checks the selectors against the first results page and a sample of its listings (see
+        'check_results_selectors' and 'check_listing_selectors')
+        :param url: Airbnb search URL
+        :param page: First results page, if already loaded (fetched from 'url' otherwise)
+        :param kwargs: Same options as 'check_results_selectors' and 'check_listing_selectors'
+        :return: The selectors that passed the check, by argument name
+        :throws SelectorHealthException: If a selector and all its alternatives are below the threshold
+        """
+        if page is None:
+            page = self._get_page(url, kwargs.get('load_time', 8))
+        selectors = self.check_results_selectors(page, **kwargs)
+        urls = [
+            self._parse_url(listing, selectors['url_selector'])
+            for listing in page.findAll(class_=selectors['css_listings'])
+        ]
+        listings = ListingCollection.from_urls(listing_url for listing_url in urls if listing_url is not None)
+        selectors.update(self.check_listing_selectors(listings, **kwargs))
+        return selectors
+
+    def check_results_selectors(self, page: BeautifulSoup, **kwargs) -> Dict:
+        """
+        Checks the selectors of the first results page, so that outdated selectors are detected before paginating.
+        When a selector's hit rate is below its threshold, its alternatives are tried in order. The 'Next page' button
+        is only required when the page is full, since a search can have a single results page
+        :param page: First results page
+        :param kwargs: Same selectors as 'extract' plus:
+            - page_size: Number of listings in a full results page (RESULTS_PAGE_SIZE by default)
+            - thresholds: Minimum hit rate of each selector (overrides SELECTOR_THRESHOLDS)
+            - alternatives: Alternative values for each selector (SELECTOR_ALTERNATIVES by default)
+        :return: The selectors that passed the check: css_next_page, css_listings and url_selector
+        :throws SelectorHealthException: If a selector and all its alternatives are below the threshold
+        """
+        selectors = {
+            'css_next_page': kwargs.get('css_next_page', CSS_NEXT_PAGE),
+            'css_listings': kwargs.get('css_listings', CSS_LISTINGS),
+            'url_selector': kwargs.get('url_selector', URL_SELECTOR),
+        }
+        self.logger.info("Checking the selectors of the results page")
+
+        self._pick_selector(selectors, 'css_listings', lambda css: float(bool(page.findAll(class_=css))), **kwargs)
+        listings = page.findAll(class_=selectors['css_listings'])
+        self._pick_selector(
+            selectors,
+            'url_selector',
+            lambda selector: self._rate([self._parse_url(listing, selector) is not None for listing in listings]),
+            **kwargs,
+        )
+        if len(listings) >= kwargs.get('page_size', RESULTS_PAGE_SIZE):
+            self._pick_selector(
+                selectors, 'css_next_page', lambda css: float(page.find(class_=css) is not None), **kwargs
+            )
+        elif page.find(class_=selectors['css_next_page']) is None:
+            self.logger.info("Single results page with %s listings, 'Next page' button not checked", len(listings))
+
+        return selectors
+
+    def check_listing_selectors(self, listings: ListingCollection, **kwargs) -> Dict:
         """
-        Extracts the all the result pages for the Airbnb website
+        Checks the selectors of the listings against a sample of them, so that outdated selectors are detected before
+        visiting every listing. When a selector's hit rate is below its threshold, its alternatives are tried in order
+        :param listings: Listings to take the sample from
+        :param kwargs: Same selectors and load_time as 'extract' plus:
+            - sample_size: Number of listings to check (HEALTH_SAMPLE_SIZE by default)
+            - thresholds: Minimum hit rate of each selector (overrides SELECTOR_THRESHOLDS)
+            - alternatives: Alternative values for each selector (SELECTOR_ALTERNATIVES by default)
+        :return: The selectors that passed the check: host_selector, css_hostname and css_permit
+        :throws SelectorHealthException: If a selector and all its alternatives are below the threshold
+        """
+        load_time = kwargs.get('load_time', 8)
+        sample_size = kwargs.get('sample_size', HEALTH_SAMPLE_SIZE)
+        selectors = {
+            'host_selector': kwargs.get('host_selector', HOST_SELECTOR),
+            'css_hostname': kwargs.get('css_hostname', CSS_HOSTNAME),
+            'css_permit': kwargs.get('css_permit', CSS_PERMIT),
+        }
+        self.logger.info("Checking the selectors of %s listings", min(sample_size, len(listings)))
+
+        soups = []
+        for listing_url in (listings.url(i) for i in range(min(sample_size, len(listings)))):
+            try:
+                soups.append(self._get_page(listing_url, load_time))
+            except ArchivedPageNotFound:
+                self.logger.warning("Listing %s not found in the archive", listing_url)
+        self._pick_selector(
+            selectors, 'host_selector', lambda selector: self._rate([soup.find(**selector) is not None for soup in soups]),
+            **kwargs,
+        )
+        self._pick_selector(
+            selectors,
+            'css_hostname',
+            lambda css: self._rate([self._parse_host(soup, selectors['host_selector'], css) is not None for soup in soups]),
+            **kwargs,
+        )
+        self._pick_selector(
+            selectors, 'css_permit', lambda css: self._rate([self._parse_permit(soup, css) is not None for soup in soups]),
+            **kwargs,
+        )
+
+        return selectors
+
+    def extract_soup(
+        self, url: str, load_time: int, click_time: int, css_next_page: str, first_page: BeautifulSoup = None
+    ) -> None:
+        """
+        Extracts the all the result pages for the Airbnb website. In replay mode, the result pages are read from the
+        archive instead
         :param url: Airbnb search URL from which to extract the pages
         :param load_time: Time in seconds to wait for the page to load
         :param click_time: Time in seconds to wait after clicking the 'Next page' button
         :param css_next_page: CSS classname of the 'Next page' button
+        :param first_page: First results page, if already loaded (the browser must still be on it)
         """
-        self.results.append(self._get_page(url, load_time))
+        if self.replay:
+            self.logger.info("Replaying result pages from the archive")
+            pages = self.archive.tagged(RESULTS_TAG)
+            if first_page is not None:
+                self.results.append(first_page)
+                pages = pages[1:]
+            self.results.extend(BeautifulSoup(html, features="html.parser") for html in pages)
+            return
+
+        from selenium.common import NoSuchElementException
+        from selenium.webdriver.common.by import By
+
+        self.results.append(first_page if first_page is not None else self._get_page(url, load_time, RESULTS_TAG))
         current_url = self.browser.current_url
 
         more_pages = True
@@ -111,7 +271,7 @@ class AirbnbScrapper(Scrapper):
                 more_pages = False
             else:
                 current_url = url_after
-                self.results.append(self._get_page(current_url, load_time))
+                self.results.append(self._get_page(current_url, load_time, RESULTS_TAG))
 
     def scrape_listings_links(self, css_listings: str, url_selector: Dict) -> List[str]:
         """
@@ -125,21 +285,18 @@ class AirbnbScrapper(Scrapper):
 
         if self.results:
             # Parsing the URLS
-            i = 1
-            for page in self.results:
+            for i, page in enumerate(self.results, start=1):
                 listings = page.findAll(class_=css_listings)
-                try:
-                    urls = [
-                        "https://" + listing.find(**url_selector)["content"]
-                        for listing in listings
-                    ]
-                    links.extend(urls)
-                except TypeError:
+                urls = [self._parse_url(listing, url_selector) for listing in listings]
+                urls = [listing_url for listing_url in urls if listing_url is not None]
+                if len(urls) < len(listings):
+                    self.logger.warning("%s listings without link in page %s", len(listings) - len(urls), i)
+                if not urls:
                     self.logger.warning("No links found in page %s", i)
-                i += 1
+                links.extend(urls)
 
             # Set the urls of the listings
-            self.listings = [ListingData(url=url) for url in links]
+            self.listings = ListingCollection.from_urls(links)
         else:
             self.logger.warning("No pages found. Try calling 'extract_soup' first")
 
@@ -152,7 +309,7 @@ class AirbnbScrapper(Scrapper):
         css_hostname,
         css_permit,
         listings: List[str] = None,
-    ) -> List[ListingData]:
+    ) -> ListingCollection:
         """
         Extracts the data from the listings
         :param load_time: Time in seconds to wait for the page to load
@@ -160,44 +317,142 @@ class AirbnbScrapper(Scrapper):
         :param css_hostname: CSS classname for the host username
         :param css_permit: CSS classname for the tourism's lodging permit
         :param listings: List of URLs of the listings
-        :return: A list containing the data from the listings
+        :return: A collection containing the data from the listings
         """
         self.listings = (
-            [ListingData(url=url) for url in listings] if listings else self.listings
+            ListingCollection.from_urls(listings) if listings else self.listings
         )
         self.logger.info("Extracting the data from the listings")
 
-        for listing in self.listings:
-            soup = self._get_page(listing.url, load_time)
-            # Host name
+        for i, listing in enumerate(self.listings):
             try:
-                host_soup = soup.find(**host_selector)
-                host_name = host_soup.find("div", class_=css_hostname).text
-                listing.host = host_name.split(": ")[-1]
-            except AttributeError:
+                soup = self._get_page(listing.url, load_time)
+            except ArchivedPageNotFound:
+                self.logger.warning("Listing %s not found in the archive", listing.url)
+                continue
+            # Host name
+            listing.host = self._parse_host(soup, host_selector, css_hostname)
+            if listing.host is None:
                 self.logger.warning("Host username couldn't be extracted")
             # Tourism permit
-            try:
-                permit_soup = soup.find(class_=css_permit)
-                permit = permit_soup.text
-                listing.permit = permit.split(" ")[-1]
-            except AttributeError:
+            listing.permit = self._parse_permit(soup, css_permit)
+            if listing.permit is None:
                 self.logger.warning("Tourism's lodging permit couldn't be extracted")
+            self.listings[i] = listing
 
         return self.listings
 
+    def first_results_page(self, url: str, load_time: int) -> BeautifulSoup:
+        """
+        Gets the first results page of a search, from the archive in replay mode
+        :param url: Airbnb search URL
+        :param load_time: Time in seconds to wait for the page to load
+        :return: The first results page
+        :throws ArchivedPageNotFound: In replay mode, if there are no archived results pages
+        """
+        if not self.replay:
+            return self._get_page(url, load_time, RESULTS_TAG)
+        pages = self.archive.tagged(RESULTS_TAG)
+        if not pages:
+            raise ArchivedPageNotFound(url, self.archive.day)
+        return BeautifulSoup(pages[0], features="html.parser")
+
+    def _pick_selector(self, selectors: Dict, name: str, hit_rate: Callable[..., float], **kwargs) -> None:
+        """
+        Sets the first candidate of a selector (its value and then its alternatives) whose hit rate reaches the
+        threshold
+        :param selectors: Selectors by argument name, updated with the candidate picked
+        :param name: Argument name of the selector
+        :param hit_rate: Function that gets the hit rate of a candidate
+        :param kwargs: thresholds and alternatives (see 'check_results_selectors')
+        :throws SelectorHealthException: If every candidate is below the threshold
+        """
+        threshold = {**SELECTOR_THRESHOLDS, **kwargs.get('thresholds', {})}[name]
+        best_rate = 0.0
+        for candidate in [selectors[name], *kwargs.get('alternatives', SELECTOR_ALTERNATIVES).get(name, [])]:
+            rate = hit_rate(candidate)
+            self.logger.info("Selector %s=%s hit rate: %.0f%%", name, candidate, rate * 100)
+            if rate >= threshold:
+                if candidate != selectors[name]:
+                    self.logger.warning("Using alternative selector %s=%s", name, candidate)
+                selectors[name] = candidate
+                return
+            best_rate = max(best_rate, rate)
+        self.logger.error("Selector %s is out of date", name)
+        raise SelectorHealthException(name, best_rate, threshold)
+
+    @staticmethod
+    def _rate(hits: List[bool]) -> float:
+        """Fraction of hits"""
+        return sum(hits) / len(hits) if hits else 0.0
+
+    def _default_filename(self) -> str:
+        """
+        Name of the csv file when none is given: yyyy-mm-dd_listings.csv, with the archive day in replay mode so a past
+        day is never appended to today's snapshot
+        :return: The name of the csv file
+        :throws ValueError: In replay mode, if the archive isn't restricted to a day
+        """
+        if not self.replay:
+            return datetime.now().strftime('%Y-%m-%d') + "_listings.csv"
+        if self.archive.day is None:
+            raise ValueError("Replaying an archive without a day needs a filename")
+        return self.archive.day + "_listings.csv"
+
+    @staticmethod
+    def _parse_url(listing: BeautifulSoup, url_selector: Dict) -> Optional[str]:
+        """
+        Parses the URL of a listing from the results page
+        :param listing: HTML of the listing in the results page
+        :param url_selector: Selector for the URL contained in the listing HTML tag
+        :return: The URL of the listing or None if it couldn't be found
+        """
+        try:
+            return "https://" + listing.find(**url_selector)["content"]
+        except (TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def _parse_host(soup: BeautifulSoup, host_selector: Dict, css_hostname: str) -> Optional[str]:
+        """
+        Parses the host username of a listing
+        :param soup: Listing page
+        :param host_selector: Selector to get the host info
+        :param css_hostname: CSS classname for the host username
+        :return: The host username or None if it couldn't be found
+        """
+        try:
+            host_soup = soup.find(**host_selector)
+            host_name = host_soup.find("div", class_=css_hostname).text
+            return host_name.split(": ")[-1]
+        except AttributeError:
+            return None
+
+    @staticmethod
+    def _parse_permit(soup: BeautifulSoup, css_permit: str) -> Optional[str]:
+        """
+        Parses the tourism's lodging permit of a listing
+        :param soup: Listing page
+        :param css_permit: CSS classname for the tourism's lodging permit
+        :return: The permit or None if it couldn't be found
+        """
+        try:
+            permit_soup = soup.find(class_=css_permit)
+            return permit_soup.text.split(" ")[-1]
+        except AttributeError:
+            return None
+
     def to_csv(self, headers: List[str], filename: str = None) -> None:
         """
-        Save the listings to a csv file
-        :param headers: Header names for the file
-        :param filename: Name of the csv file (yyyy-mm-dd_listings.csv as default)
+        Save the listings to a csv file. The listings are appended if the file already exists
+        :param headers: Header names for the file (only written to new files)
+        :param filename: Name of the csv file (yyyy-mm-dd_listings.csv as default, with the archive day in replay mode)
         :return:
         """
-        data = [headers]
-        for listing in self.listings:
-            data.append(listing.to_list())
+        file = filename if filename is not None else self._default_filename()
+        data = [] if os.path.exists(file) and os.path.getsize(file) > 0 else [headers]
+        data.extend(self.listings.to_lists())
 
-        file = filename if filename is not None else datetime.now().strftime('%Y-%m-%d') + "_listings.csv"
         self.logger.info(f"Saving listings to {file}")
         with open(file, mode="a", newline="", encoding="UTF-8") as f:
             writer = csv.writer(f)
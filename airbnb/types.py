@@ -1,8 +1,12 @@
+from array import array
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Union
 
+from airbnb.utils import LISTING_ID_PATTERN
+from airbnb.vars import LISTING_URL
 
-@dataclass
+
+@dataclass(slots=True)
 class ListingData:
     """
     Class representing the relevant data for an Airbnb listing
@@ -23,3 +27,119 @@ class ListingData:
         :return: List of strings containing the data ['url', 'host', 'permit']
         """
         return [self.url, self.host, self.permit]
+
+
+class ListingCollection:
+    """
+    Columnar collection of Airbnb listings.
+
+    The listings are stored as arrays: the URLs as listing ids, and the hosts and permits as indices into a table of
+    interned strings (-1 when missing). URLs without a listing id are kept in a separate table and referenced with
+    negative ids. Indexing and iterating return ListingData objects built on demand, so the collection can be used as a
+    list of listings.
+
+    The listings returned are copies: changing them doesn't change the collection, so they have to be assigned back
+    (``listing = collection[i]; listing.host = host; collection[i] = listing``). Slicing returns a new collection
+    that shares the strings tables with the original one.
+    """
+
+    def __init__(self, listings: Iterable[ListingData] = ()) -> None:
+        self._ids = array("q")
+        self._hosts = array("i")
+        self._permits = array("i")
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self._urls: List[str] = []
+        self.extend(listings)
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str]) -> "ListingCollection":
+        """
+        Creates a collection of listings without host or permit
+        :param urls: URLs of the listings
+        :return: The collection
+        """
+        return cls(ListingData(url=url) for url in urls)
+
+    def append(self, listing: ListingData) -> None:
+        """
+        Adds a listing to the end of the collection
+        :param listing: Listing to add
+        """
+        self._ids.append(self._encode_url(listing.url))
+        self._hosts.append(self._intern(listing.host))
+        self._permits.append(self._intern(listing.permit))
+
+    def extend(self, listings: Iterable[ListingData]) -> None:
+        """
+        Adds several listings to the end of the collection
+        :param listings: Listings to add
+        """
+        for listing in listings:
+            self.append(listing)
+
+    def url(self, index: int) -> str:
+        """
+        Gets the URL of a listing without building the whole listing
+        :param index: Position of the listing
+        :return: The URL of the listing
+        """
+        listing_id = self._ids[index]
+        return LISTING_URL.format(listing_id) if listing_id >= 0 else self._urls[-listing_id - 1]
+
+    def to_lists(self) -> Iterator[List[str]]:
+        """
+        Converts the listings to lists of strings
+        :return: Iterator of lists containing the data ['url', 'host', 'permit']
+        """
+        for index in range(len(self)):
+            yield [self.url(index), self._string(self._hosts[index]), self._string(self._permits[index])]
+
+    def _encode_url(self, url: str) -> int:
+        """Listing id of a URL, or negative reference to the URLs table if it doesn't contain one"""
+        match = LISTING_ID_PATTERN.search(url)
+        if match:
+            return int(match.group(1))
+        self._urls.append(url)
+        return -len(self._urls)
+
+    def _intern(self, value: str) -> int:
+        """Index of a string in the strings table, adding it if needed (-1 for None)"""
+        if value is None:
+            return -1
+        index = self._string_index.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings.append(value)
+            self._string_index[value] = index
+        return index
+
+    def _string(self, index: int) -> str:
+        """String of the strings table (None for -1)"""
+        return self._strings[index] if index >= 0 else None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ListingData, "ListingCollection"]:
+        if isinstance(index, slice):
+            collection = ListingCollection()
+            collection._ids = self._ids[index]
+            collection._hosts = self._hosts[index]
+            collection._permits = self._permits[index]
+            # The tables only grow, so their indices stay valid when shared
+            collection._strings = self._strings
+            collection._string_index = self._string_index
+            collection._urls = self._urls
+            return collection
+        return ListingData(self.url(index), self._string(self._hosts[index]), self._string(self._permits[index]))
+
+    def __setitem__(self, index: int, listing: ListingData) -> None:
+        if listing.url != self.url(index):
+            self._ids[index] = self._encode_url(listing.url)
+        self._hosts[index] = self._intern(listing.host)
+        self._permits[index] = self._intern(listing.permit)
+
+    def __iter__(self) -> Iterator[ListingData]:
+        for index in range(len(self)):
+            yield self[index]
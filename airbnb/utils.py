@@ -0,0 +1,28 @@
+import re
+
+LISTING_ID_PATTERN = re.compile(r"/rooms/(?:plus/)?(\d+)")
+""" Pattern of the listing id in an Airbnb listing URL """
+
+PERMIT_SPACES = re.compile(r"\s+")
+""" Whitespace removed from the permit numbers, hosts write them as 'vft/gr/ 01234' or 'VFT/GR/01234' """
+
+
+def listing_id(url: str) -> str:
+    """
+    Gets the id of an Airbnb listing from its URL
+    :param url: URL of the listing
+    :return: The listing id, or the URL without query string if it doesn't contain one
+    """
+    match = LISTING_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return url.split("?")[0]
+
+
+def normalize_permit(permit: str) -> str:
+    """
+    Normalizes a permit number so the same permit written differently compares equal
+    :param permit: Permit number as written by the host
+    :return: The permit number in uppercase and without spaces
+    """
+    return PERMIT_SPACES.sub("", permit).upper()
@@ -5,12 +5,18 @@ Global constants used in the module
 AIRBNB_URL = "https://www.airbnb.es/s/Granada--España/homes"
 """ Airbnb URL to scrape """
 
+LISTING_URL = "https://www.airbnb.es/rooms/{}"
+""" URL of a listing given its id """
+
 CSS_LISTINGS = "c1l1h97y"
 """ CSS classname of airbnb listings """
 
 URL_SELECTOR = {"name": "meta", "attrs": {"itemprop": "url"}}
 """ Selector to get the url of the listings """
 
+RESULTS_TAG = "results"
+""" Archive tag of the listings pages """
+
 CSS_NEXT_PAGE = "c1ytbx3a"
 """ CSS classname of the next page button in the listings page """
 
@@ -25,3 +31,22 @@ CSS_HOSTNAME = "t1pxe1a4"
 
 CSV_HEADERS = ["URL", "ANFITRION", "PERMISO"]
 """ Headers for the csv file with the data """
+
+RESULTS_PAGE_SIZE = 18
+""" Number of listings in a full results page """
+
+HEALTH_SAMPLE_SIZE = 5
+""" Number of listings checked before the full crawl """
+
+SELECTOR_THRESHOLDS = {
+    "css_next_page": 1.0,  # Only checked when the first results page is full
+    "css_listings": 1.0,
+    "url_selector": 0.9,
+    "host_selector": 0.8,
+    "css_hostname": 0.8,
+    "css_permit": 0.2,  # Not every listing shows a permit
+}
+""" Minimum hit rate of each selector in the selectors check """
+
+SELECTOR_ALTERNATIVES = {}
+""" Alternative values to try for each selector when it fails the selectors check (e.g. {"css_permit": ["abc123"]}) """
@@ -0,0 +1,13 @@
+"""
+Analysis module
+
+Classes:
+    ListingsAnalysis: Class responsible for computing the daily indicators of the listings snapshots
+
+Functions:
+    registry_files: Lists the latest JA registry files of a directory
+"""
+
+from .indicators import ListingsAnalysis, registry_files
+
+__all__ = ["ListingsAnalysis", "registry_files"]
@@ -0,0 +1,281 @@
+import logging
+import os
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from airbnb.utils import LISTING_ID_PATTERN, PERMIT_SPACES
+from airbnb.vars import CSV_HEADERS
+from exceptions.analysis import RegistryNotLoaded
+from history.vars import SNAPSHOT_SUFFIX
+from analysis.vars import (
+    REGISTRY_PATTERN,
+    REGISTRY_FILE_PATTERN,
+    LISTINGS,
+    HOSTS,
+    LISTINGS_PER_HOST,
+    MULTI_LISTING_HOSTS,
+    SHARED_PERMITS,
+    UNREGISTERED_RATE,
+    INDICATORS,
+)
+
+
+class ListingsAnalysis:
+    """
+    Class responsible for computing the daily indicators of the listings snapshots.
+
+    The observations are kept in a columnar table (one row per listing and day, with the hosts and permits as
+    categories) and the indicators are computed with group-bys over it. Adding snapshots only computes the indicators
+    of their days. Without a JA registry, the unregistered rate is unknown (NaN).
+
+    Attributes:
+        logger      (logging.Logger): logger instance for the class
+        registry    (pd.Index): Permits in the JA registry
+        indicators  (pd.DataFrame): Indicators by day
+    """
+
+    logger = logging.getLogger("ListingsAnalysis")
+
+    def __init__(self, registry_paths: List[str] = None) -> None:
+        self.registry = pd.Index([], dtype=object)
+        self.indicators = pd.DataFrame(columns=INDICATORS, index=pd.DatetimeIndex([], name="DATE"))
+        self._listings: pd.DataFrame = None
+        if registry_paths:
+            self.load_registry(registry_paths)
+
+    @property
+    def listings(self) -> pd.DataFrame:
+        """Observations of every day: DATE, ID, HOST and PERMIT"""
+        return self._listings if self._listings is not None else _empty_listings()
+
+    def add_snapshot(self, path: str) -> pd.Series:
+        """
+        Loads a listings csv file and computes the indicators of its day. Days already loaded are ignored
+        :param path: Path to the listings csv file (yyyy-mm-dd_listings.csv)
+        :return: The indicators of the day
+        """
+        self.add_snapshots([path])
+        return self.indicators.loc[_snapshot_date(path)]
+
+    def add_snapshots(self, paths: List[str]) -> pd.DataFrame:
+        """
+        Loads several listings csv files and computes the indicators of their days. Days already loaded are ignored
+        :param paths: Paths to the listings csv files
+        :return: The indicators of every day
+        """
+        days = []
+        dates = []
+        for path in sorted(paths, key=os.path.basename):
+            date = _snapshot_date(path)
+            if date in self.indicators.index or date in dates:
+                self.logger.info("Snapshot of %s already loaded", date.date())
+                continue
+            day = _read_snapshot(path, date)
+            self.logger.info("Loaded %s listings from %s", len(day), path)
+            days.append(day)
+            dates.append(date)
+        if not days:
+            return self.indicators
+
+        new = _concat(days)
+        self._listings = new if self._listings is None else _concat([self._listings, new])
+
+        indicators = self._compute(new, dates)
+        if self.indicators.empty:
+            self.indicators = indicators
+        else:
+            self.indicators = pd.concat([self.indicators, indicators]).sort_index()
+        return self.indicators
+
+    def add_directory(self, directory: str) -> pd.DataFrame:
+        """
+        Loads the listings csv files of a directory
+        :param directory: Directory with the snapshots
+        :return: The indicators of every day
+        """
+        return self.add_snapshots(
+            [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(SNAPSHOT_SUFFIX)]
+        )
+
+    def load_registry(self, paths: List[str], column: str = None) -> None:
+        """
+        Loads the permits of the JA registry excel files and updates the unregistered rate of every day
+        :param paths: Paths to the excel files
+        :param column: Name of the column with the registry numbers (found with REGISTRY_PATTERN by default)
+        """
+        permits = []
+        for path in paths:
+            sheet = pd.read_excel(path, dtype=str)
+            sheet_column = column if column else _registry_column(sheet)
+            if sheet_column is None:
+                self.logger.warning("Registry numbers not found in %s", path)
+                continue
+            permits.append(_normalize(sheet[sheet_column].dropna()))
+        self.registry = pd.Index(pd.concat(permits).unique() if permits else [], dtype=object)
+        self.logger.info("Loaded %s registered permits", len(self.registry))
+
+        if self._listings is not None:
+            listings = self._listings
+            self.indicators[UNREGISTERED_RATE] = self._unregistered(listings).groupby(listings["DATE"]).mean()
+
+    def listings_per_host(self, date: str = None) -> pd.Series:
+        """
+        Number of listings of each host
+        :param date: Day (yyyy-mm-dd) to count (every day by default)
+        :return: Listings by host (and day), from most to least listings
+        """
+        listings = self._select(date)
+        counts = listings.groupby(["DATE", "HOST"], observed=True).size()
+        return counts.sort_values(ascending=False)
+
+    def shared_permits(self, date: str = None) -> pd.Series:
+        """
+        Permits used by more than one listing
+        :param date: Day (yyyy-mm-dd) to check (every day by default)
+        :return: Number of listings by permit (and day), only for the permits used several times
+        """
+        listings = self._select(date).dropna(subset=["PERMIT"])
+        counts = listings.groupby(["DATE", "PERMIT"], observed=True)["ID"].nunique()
+        return counts[counts > 1].sort_values(ascending=False)
+
+    def match_permits(self, date: str = None) -> pd.DataFrame:
+        """
+        Matches the permits of the listings with the JA registry
+        :param date: Day (yyyy-mm-dd) to match (every day by default)
+        :return: The listings with a REGISTERED column
+        :throws RegistryNotLoaded: If no JA registry is loaded
+        """
+        if len(self.registry) == 0:
+            raise RegistryNotLoaded()
+        listings = self._select(date)
+        return listings.assign(REGISTERED=~self._unregistered(listings))
+
+    def _select(self, date: str = None) -> pd.DataFrame:
+        """Observations of a day, or of every day"""
+        listings = self.listings
+        if date is None:
+            return listings
+        return listings[listings["DATE"] == pd.Timestamp(date)]
+
+    def _unregistered(self, listings: pd.DataFrame) -> pd.Series:
+        """Whether the permit of each listing is not in the registry (NaN if no registry is loaded)"""
+        if len(self.registry) == 0:
+            return pd.Series(np.nan, index=listings.index)
+        return ~listings["PERMIT"].isin(self.registry)
+
+    def _compute(self, listings: pd.DataFrame, dates: List[pd.Timestamp]) -> pd.DataFrame:
+        """
+        Computes the indicators of the observations
+        :param listings: Observations of one or several days
+        :param dates: Days to compute, including the ones without observations
+        :return: Indicators by day (zero counts and NaN rates for the days without observations)
+        """
+        by_date = listings.groupby("DATE")
+        per_host = listings.groupby(["DATE", "HOST"], observed=True).size()
+        per_permit = listings.dropna(subset=["PERMIT"]).groupby(["DATE", "PERMIT"], observed=True)["ID"].nunique()
+        hosts = per_host.groupby(level="DATE")
+        indicators = pd.DataFrame({
+            LISTINGS: by_date.size(),
+            HOSTS: hosts.size(),
+            LISTINGS_PER_HOST: hosts.mean(),
+            MULTI_LISTING_HOSTS: (per_host > 1).groupby(level="DATE").mean(),
+            SHARED_PERMITS: (per_permit > 1).groupby(level="DATE").sum(),
+            UNREGISTERED_RATE: self._unregistered(listings).groupby(listings["DATE"]).mean(),
+        })
+        indicators = indicators.reindex(pd.DatetimeIndex(dates, name="DATE"))
+        for column in (LISTINGS, HOSTS, SHARED_PERMITS):
+            indicators[column] = indicators[column].fillna(0).astype(np.int64)
+        return indicators[INDICATORS]
+
+
+def registry_files(directory: str) -> List[str]:
+    """
+    Lists the JA registry excel files of the latest day in a directory (yyyy-mm-dd_<activity>.xlsx)
+    :param directory: Directory with the excel files
+    :return: Paths to the excel files
+    """
+    files = sorted(name for name in os.listdir(directory) if re.match(REGISTRY_FILE_PATTERN, name))
+    if not files:
+        return []
+    latest = files[-1][:10]
+    return [os.path.join(directory, name) for name in files if name.startswith(latest)]
+
+
+def _snapshot_date(path: str) -> pd.Timestamp:
+    """Date of a listings csv file (yyyy-mm-dd_listings.csv)"""
+    return pd.Timestamp(os.path.basename(path)[:10])
+
+
+def _read_snapshot(path: str, date: pd.Timestamp) -> pd.DataFrame:
+    """
+    Reads a listings csv file into a table with one row per listing
+    :param path: Path to the listings csv file
+    :param date: Date of the snapshot
+    :return: Table with the columns DATE, ID, HOST and PERMIT (as categories)
+    """
+    raw = pd.read_csv(path, names=CSV_HEADERS, header=None, dtype=str, usecols=[0, 1, 2])
+    raw = raw[raw[CSV_HEADERS[0]] != CSV_HEADERS[0]]  # Headers repeated when the file was appended to
+
+    ids = pd.to_numeric(raw[CSV_HEADERS[0]].str.extract(LISTING_ID_PATTERN.pattern, expand=False), errors="coerce")
+    if ids.isna().any():
+        ListingsAnalysis.logger.warning("%s listings without id in %s", ids.isna().sum(), path)
+    day = pd.DataFrame({
+        "DATE": date,
+        "ID": ids,
+        "HOST": raw[CSV_HEADERS[1]],
+        "PERMIT": _normalize(raw[CSV_HEADERS[2]]),
+    }).dropna(subset=["ID"])
+    day["ID"] = day["ID"].astype(np.int64)
+
+    # One row per listing, preferring the rows with a permit
+    day = day.sort_values("PERMIT", na_position="first").drop_duplicates("ID", keep="last").reset_index(drop=True)
+    day["HOST"] = day["HOST"].astype("category")
+    day["PERMIT"] = day["PERMIT"].astype("category")
+    return day
+
+
+def _concat(days: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates observations tables, keeping the hosts and permits as categories
+    :param days: Observations tables
+    :return: The concatenated table
+    """
+    listings = pd.concat([day[["DATE", "ID"]] for day in days], ignore_index=True)
+    for column in ("HOST", "PERMIT"):
+        listings[column] = union_categoricals([day[column] for day in days])
+    return listings
+
+
+def _registry_column(sheet: pd.DataFrame) -> str:
+    """
+    Finds the column of an excel sheet with the most registry numbers
+    :param sheet: Excel sheet
+    :return: Name of the column or None if no column has registry numbers
+    """
+    matches = {
+        column: _normalize(sheet[column].dropna()).str.match(REGISTRY_PATTERN).mean()
+        for column in sheet.columns
+        if sheet[column].notna().any()
+    }
+    column = max(matches, key=matches.get, default=None)
+    return column if column is not None and matches[column] > 0 else None
+
+
+def _normalize(permits: pd.Series) -> pd.Series:
+    """Normalizes permit numbers like airbnb.utils.normalize_permit and turns empty values into NaN"""
+    permits = permits.str.replace(PERMIT_SPACES, "", regex=True).str.upper()
+    return permits.mask(permits == "")
+
+
+def _empty_listings() -> pd.DataFrame:
+    """Observations table without rows"""
+    return pd.DataFrame({
+        "DATE": pd.Series(dtype="datetime64[ns]"),
+        "ID": pd.Series(dtype=np.int64),
+        "HOST": pd.Series(dtype="category"),
+        "PERMIT": pd.Series(dtype="category"),
+    })
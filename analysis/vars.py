@@ -0,0 +1,30 @@
+"""
+Global constants used in the module
+"""
+
+REGISTRY_PATTERN = r"^[A-Z]+/[A-Z]{2}/\d+$"
+""" Pattern of the JA registry numbers (e.g. VFT/GR/01234), used to find the registry column of the excel files """
+
+REGISTRY_FILE_PATTERN = r"^\d{4}-\d{2}-\d{2}_.*\.xlsx$"
+""" Pattern of the dated JA registry files (yyyy-mm-dd_<activity>.xlsx), leftovers like exportacion.xlsx don't match """
+
+LISTINGS = "ANUNCIOS"
+""" Indicator: number of listings """
+
+HOSTS = "ANFITRIONES"
+""" Indicator: number of hosts """
+
+LISTINGS_PER_HOST = "ANUNCIOS_POR_ANFITRION"
+""" Indicator: mean number of listings per host """
+
+MULTI_LISTING_HOSTS = "ANFITRIONES_MULTIPLES"
+""" Indicator: share of hosts with more than one listing """
+
+SHARED_PERMITS = "PERMISOS_COMPARTIDOS"
+""" Indicator: number of permits used by more than one listing """
+
+UNREGISTERED_RATE = "SIN_REGISTRO"
+""" Indicator: share of listings without a permit found in the JA registry """
+
+INDICATORS = [LISTINGS, HOSTS, LISTINGS_PER_HOST, MULTI_LISTING_HOSTS, SHARED_PERMITS, UNREGISTERED_RATE]
+""" Columns of the indicators table """
@@ -0,0 +1,60 @@
+"""
+Pytest configuration: makes the packages of the repository importable from the tests, and defines the fixtures
+shared by the tests
+"""
+
+import csv
+
+import pytest
+
+from airbnb.vars import CSS_LISTINGS, CSS_NEXT_PAGE, CSS_HOSTNAME, CSS_PERMIT
+
+SNAPSHOT_URL = "https://www.airbnb.es/rooms/{}?adults=1"
+
+
+@pytest.fixture
+def results_page():
+    """Builds an Airbnb results page with the given listing ids (and a 'Next page' button)"""
+
+    def build(ids, next_page: bool = True) -> str:
+        listings = "".join(
+            f'<div class="{CSS_LISTINGS}"><meta itemprop="url" content="www.airbnb.es/rooms/{key}?adults=1"></div>'
+            for key in ids
+        )
+        button = f'<button class="{CSS_NEXT_PAGE}">Siguiente</button>' if next_page else ""
+        return f"<html><body>{listings}{button}</body></html>"
+
+    return build
+
+
+@pytest.fixture
+def listing_page():
+    """Builds an Airbnb listing page with the given host and permit"""
+
+    def build(host: str = None, permit: str = None) -> str:
+        html = ""
+        if host is not None:
+            html += (
+                '<div data-section-id="HOST_OVERVIEW_DEFAULT">'
+                f'<div class="{CSS_HOSTNAME}">Anfitrión: {host}</div></div>'
+            )
+        if permit is not None:
+            html += f'<span class="{CSS_PERMIT}">Número de registro {permit}</span>'
+        return f"<html><body>{html}</body></html>"
+
+    return build
+
+
+@pytest.fixture
+def write_snapshot():
+    """Writes a listings csv file (yyyy-mm-dd_listings.csv) with the given (id, host, permit) rows"""
+
+    def write(directory, date: str, rows) -> str:
+        path = directory / f"{date}_listings.csv"
+        with open(path, mode="w", newline="", encoding="UTF-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["URL", "ANFITRION", "PERMISO"])
+            writer.writerows([SNAPSHOT_URL.format(key), host, permit] for key, host, permit in rows)
+        return str(path)
+
+    return write
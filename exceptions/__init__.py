@@ -13,6 +13,13 @@ Scrapping Exceptions:
 
     WaitTimeoutException
 
+    SelectorHealthException
+
 Files Exceptions:
     RenameFileException
+
+    ArchivedPageNotFound
+
+Analysis Exceptions:
+    RegistryNotLoaded
 """
\ No newline at end of file
@@ -0,0 +1,11 @@
+class RegistryNotLoaded(Exception):
+    """
+    Exception raised when the permits are matched without a JA registry
+
+    Attributes:
+        message: Explanation of the error (optional)
+    """
+
+    def __init__(self, message: str = None):
+        self.message = message if message else "No JA registry loaded, load the registry excel files first"
+        super().__init__(self.message)
@@ -23,3 +23,22 @@ class RenameFileException(Exception):
             self.message = message
 
         super().__init__(self.message)
+
+
+class ArchivedPageNotFound(Exception):
+    """
+    Exception raised when a page is not found in the page archive
+
+    Attributes:
+        url: URL of the page (optional)
+        day: Day the archive lookups are restricted to (optional)
+    """
+
+    def __init__(self, url: str = None, day: str = None):
+        self.url = url
+        self.day = day
+        if self.day:
+            self.message = f"Page not archived on {self.day}: '{self.url}'"
+        else:
+            self.message = f"Page not archived: '{self.url}'"
+        super().__init__(self.message)
@@ -22,3 +22,20 @@ class WaitTimeoutException(Exception):
         self.element = element
         self.message = f"Timed out waiting for: {self.element}. Increase timeout limit and check that the element exists"
         super().__init__(self.message)
+
+
+class SelectorHealthException(Exception):
+    """Exception raised when a selector's hit rate is below its threshold
+
+    Attributes:
+        selector: Name of the selector (optional)
+        hit_rate: Best hit rate of the selector and its alternatives (optional)
+        threshold: Minimum hit rate (optional)
+    """
+
+    def __init__(self, selector=None, hit_rate: float = None, threshold: float = None):
+        self.selector = selector
+        self.hit_rate = hit_rate
+        self.threshold = threshold
+        self.message = f"Selector out of date: {self.selector} (hit rate {self.hit_rate}, threshold {self.threshold})"
+        super().__init__(self.message)
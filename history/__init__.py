@@ -0,0 +1,20 @@
+"""
+Listings history module
+
+Classes:
+    Snapshot: Sorted listings of a day, read from a listings csv file
+
+    Change: Class containing a change between two snapshots
+
+Functions:
+    diff_snapshots: Compares two consecutive snapshots
+
+    write_change_log: Writes the changes of a series of snapshots to a csv file
+
+    snapshot_files: Lists the snapshot files of a directory, sorted by date
+"""
+
+from .diff import Snapshot, diff_snapshots, write_change_log, snapshot_files
+from .types import Change
+
+__all__ = ["Snapshot", "Change", "diff_snapshots", "write_change_log", "snapshot_files"]
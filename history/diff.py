@@ -0,0 +1,295 @@
+import csv
+import heapq
+import logging
+import os
+import shutil
+import tempfile
+from collections import Counter
+from typing import Iterable, Iterator, List, Tuple
+
+from airbnb.utils import listing_id, normalize_permit
+from airbnb.vars import CSV_HEADERS
+from history.types import Change
+from history.vars import (
+    SNAPSHOT_SUFFIX,
+    CHUNK_SIZE,
+    NEW_LISTING,
+    DELISTED,
+    PERMIT_ADDED,
+    PERMIT_REMOVED,
+    PERMIT_CHANGED,
+    HOST_CHANGED,
+    HOST_GAINED,
+    HOST_LOST,
+    CHANGE_LOG_HEADERS,
+)
+
+logger = logging.getLogger("History")
+
+Row = Tuple[str, str, str]
+""" Snapshot row: (listing id, host, permit) """
+
+
+class Snapshot:
+    """
+    Listings of a day, sorted by listing id and de-duplicated.
+
+    The rows are sorted in chunks of 'chunk_size' rows that are merged into a temporary file, so memory use doesn't
+    depend on the size of the snapshot.
+
+    Attributes:
+        path        (str): Path to the listings csv file
+        date        (str): Date of the snapshot (yyyy-mm-dd)
+        chunk_size  (int): Maximum number of rows sorted in memory
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        self.path = path
+        self.date = os.path.basename(path)[:10]
+        self.chunk_size = chunk_size
+        self._sorted_path: str = None
+
+    def rows(self) -> Iterator[Row]:
+        """
+        Iterates over the rows of the snapshot sorted by listing id
+        :return: Iterator of (listing id, host, permit)
+        """
+        if self._sorted_path is None:
+            self._sort()
+        with open(self._sorted_path, mode="r", newline="", encoding="UTF-8") as f:
+            for row in csv.reader(f):
+                yield row[0], row[1], row[2]
+
+    def close(self) -> None:
+        """Removes the sorted temporary file"""
+        if self._sorted_path is not None:
+            os.remove(self._sorted_path)
+            self._sorted_path = None
+
+    def _read(self) -> Iterator[Row]:
+        """
+        Reads the rows of the csv file, skipping the headers (repeated when the file was appended to), with the
+        permit numbers normalized
+        """
+        with open(self.path, mode="r", newline="", encoding="UTF-8") as f:
+            for row in csv.reader(f):
+                if not row or row[0] == CSV_HEADERS[0]:
+                    continue
+                row += [""] * (3 - len(row))
+                yield listing_id(row[0]), row[1], normalize_permit(row[2])
+
+    def _sort(self) -> None:
+        """External sort of the csv file by listing id, keeping one row per listing"""
+        chunks = []
+        try:
+            chunk = []
+            for row in self._read():
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    chunks.append(_write_run(sorted(chunk)))
+                    chunk = []
+            if chunk or not chunks:
+                chunks.append(_write_run(sorted(chunk)))
+
+            readers = [_read_run(path) for path in chunks]
+            self._sorted_path = _write_run(_unique(heapq.merge(*readers)))
+        finally:
+            for path in chunks:
+                os.remove(path)
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Iterator[Change]:
+    """
+    Compares two snapshots with a sort-merge join on the listing id
+    :param old: Previous snapshot
+    :param new: Newest snapshot
+    :return: Iterator of the changes, dated with the newest snapshot
+    """
+    date = new.date
+    old_hosts = Counter()
+    new_hosts = Counter()
+    old_rows = old.rows()
+    new_rows = new.rows()
+    old_row = next(old_rows, None)
+    new_row = next(new_rows, None)
+
+    while old_row is not None or new_row is not None:
+        if new_row is None or (old_row is not None and old_row[0] < new_row[0]):
+            old_hosts[old_row[1]] += 1
+            yield Change(date, DELISTED, old_row[0], old=old_row[2])
+            old_row = next(old_rows, None)
+        elif old_row is None or new_row[0] < old_row[0]:
+            new_hosts[new_row[1]] += 1
+            yield Change(date, NEW_LISTING, new_row[0], new=new_row[2])
+            new_row = next(new_rows, None)
+        else:
+            key, old_host, old_permit = old_row
+            _, new_host, new_permit = new_row
+            old_hosts[old_host] += 1
+            new_hosts[new_host] += 1
+            if old_permit != new_permit:
+                if not old_permit:
+                    yield Change(date, PERMIT_ADDED, key, new=new_permit)
+                elif not new_permit:
+                    yield Change(date, PERMIT_REMOVED, key, old=old_permit)
+                else:
+                    yield Change(date, PERMIT_CHANGED, key, old_permit, new_permit)
+            if old_host and new_host and old_host != new_host:
+                yield Change(date, HOST_CHANGED, key, old_host, new_host)
+            old_row = next(old_rows, None)
+            new_row = next(new_rows, None)
+
+    # Hosts
+    for host in sorted(old_hosts.keys() | new_hosts.keys()):
+        if not host or old_hosts[host] == new_hosts[host]:
+            continue
+        kind = HOST_GAINED if new_hosts[host] > old_hosts[host] else HOST_LOST
+        yield Change(date, kind, host, str(old_hosts[host]), str(new_hosts[host]))
+
+
+def write_change_log(files: List[str], output: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Writes the changes between consecutive snapshots to a csv file. If the file already exists, only the snapshots
+    newer than its last date are compared and the changes are appended. The changes of a day are only appended once
+    the day has been fully compared, so an interrupted run never leaves a partial day behind
+    :param files: Paths to the listings csv files (yyyy-mm-dd_listings.csv)
+    :param output: Path to the change log csv file
+    :param chunk_size: Maximum number of rows sorted in memory
+    :return: Number of changes written
+    """
+    files = sorted(files, key=os.path.basename)
+    last_date = _last_date(output)
+    if last_date is not None:
+        # Keep the last compared snapshot as the base for the new ones
+        previous = [path for path in files if os.path.basename(path)[:10] <= last_date]
+        files = previous[-1:] + [path for path in files if os.path.basename(path)[:10] > last_date]
+    if len(files) < 2:
+        logger.info("No new snapshots to compare")
+        return 0
+
+    if last_date is None:
+        with open(output, mode="w", newline="", encoding="UTF-8") as f:
+            csv.writer(f).writerow(CHANGE_LOG_HEADERS)
+
+    written = 0
+    old = Snapshot(files[0], chunk_size)
+    try:
+        for path in files[1:]:
+            new = Snapshot(path, chunk_size)
+            try:
+                changes = _append_changes(diff_snapshots(old, new), output)
+                logger.info("%s changes between %s and %s", changes, old.date, new.date)
+                written += changes
+            except Exception:
+                new.close()
+                raise
+            finally:
+                old.close()
+            old = new
+    finally:
+        old.close()
+    return written
+
+
+def snapshot_files(directory: str) -> List[str]:
+    """
+    Lists the listings csv files of a directory
+    :param directory: Directory with the snapshots
+    :return: Paths to the snapshots, sorted by date
+    """
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(SNAPSHOT_SUFFIX)
+    )
+
+
+def _append_changes(changes: Iterable[Change], output: str) -> int:
+    """
+    Appends the changes of a day to the change log. The changes are written to a temporary file first and copied at
+    once when they are complete (the copy is undone if it fails)
+    :param changes: Changes of the day
+    :param output: Path to the change log csv file
+    :return: Number of changes appended
+    """
+    descriptor, path = tempfile.mkstemp(suffix=".csv", prefix="changes_")
+    try:
+        count = 0
+        with os.fdopen(descriptor, mode="w", newline="", encoding="UTF-8") as f:
+            writer = csv.writer(f)
+            for change in changes:
+                writer.writerow(change.to_list())
+                count += 1
+
+        size = os.path.getsize(output)
+        with open(path, mode="rb") as day, open(output, mode="ab") as f:
+            try:
+                shutil.copyfileobj(day, f)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(size)
+                raise
+    finally:
+        os.remove(path)
+    return count
+
+
+def _unique(rows: Iterator[Row]) -> Iterator[Row]:
+    """
+    Keeps one row per listing id (sorted input), preferring rows with a permit and then rows with a host
+    :param rows: Rows sorted by listing id
+    """
+    best = None
+    for row in rows:
+        if best is not None and row[0] == best[0]:
+            if (bool(row[2]), bool(row[1])) > (bool(best[2]), bool(best[1])):
+                best = row
+            continue
+        if best is not None:
+            yield best
+        best = row
+    if best is not None:
+        yield best
+
+
+def _write_run(rows) -> str:
+    """
+    Writes rows to a temporary csv file
+    :param rows: Rows to write
+    :return: Path to the file
+    """
+    descriptor, path = tempfile.mkstemp(suffix=".csv", prefix="snapshot_")
+    with os.fdopen(descriptor, mode="w", newline="", encoding="UTF-8") as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Row]:
+    """
+    Reads the rows of a temporary csv file
+    :param path: Path to the file
+    """
+    with open(path, mode="r", newline="", encoding="UTF-8") as f:
+        for row in csv.reader(f):
+            yield row[0], row[1], row[2]
+
+
+def _last_date(output: str):
+    """
+    Gets the latest date of a change log
+    :param output: Path to the change log csv file
+    :return: The latest date or None if the file doesn't exist
+    """
+    if not os.path.exists(output) or os.path.getsize(output) == 0:
+        return None
+    last_date = ""
+    with open(output, mode="r", newline="", encoding="UTF-8") as f:
+        for row in csv.reader(f):
+            if row and row[0] != CHANGE_LOG_HEADERS[0]:
+                last_date = max(last_date, row[0])
+    return last_date
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class Change:
+    """
+    Class representing a change between two snapshots
+
+    Attributes:
+        date (str): Date of the newest snapshot (yyyy-mm-dd)
+        kind (str): Kind of change (see vars.py)
+        key (str): Listing id, or host username for host changes
+        old (str): Value before the change (permit, host or number of listings)
+        new (str): Value after the change (permit, host or number of listings)
+    """
+
+    date: str
+    kind: str
+    key: str
+    old: str = None
+    new: str = None
+
+    def to_list(self) -> List[str]:
+        """
+        Converts the change to a list of strings
+        :return: List of strings containing the data ['date', 'kind', 'key', 'old', 'new']
+        """
+        return [self.date, self.kind, self.key, self.old, self.new]
@@ -0,0 +1,36 @@
+"""
+Global constants used in the module
+"""
+
+SNAPSHOT_SUFFIX = "_listings.csv"
+""" Suffix of the listings csv files (yyyy-mm-dd_listings.csv) """
+
+CHUNK_SIZE = 100_000
+""" Maximum number of rows sorted in memory """
+
+NEW_LISTING = "NUEVO"
+""" Change kind: listing not found in the previous snapshot """
+
+DELISTED = "RETIRADO"
+""" Change kind: listing not found in the new snapshot """
+
+PERMIT_ADDED = "PERMISO_NUEVO"
+""" Change kind: listing shows a permit it didn't show before """
+
+PERMIT_REMOVED = "PERMISO_RETIRADO"
+""" Change kind: listing no longer shows its permit """
+
+PERMIT_CHANGED = "PERMISO_CAMBIADO"
+""" Change kind: listing shows a different permit """
+
+HOST_CHANGED = "ANFITRION_CAMBIADO"
+""" Change kind: listing has a different host """
+
+HOST_GAINED = "ANFITRION_SUMA"
+""" Change kind: host has more listings than before """
+
+HOST_LOST = "ANFITRION_RESTA"
+""" Change kind: host has less listings than before """
+
+CHANGE_LOG_HEADERS = ["FECHA", "CAMBIO", "ID", "ANTES", "DESPUES"]
+""" Headers for the change log csv file """
@@ -5,6 +5,13 @@ Classes:
     JAScrapper: Class responsible for scraping the Junta de Andalucía tourism registers
 
 """
-from .scrapper import JAScrapper
 
 __all__ = ['JAScrapper']
+
+
+def __getattr__(name: str):
+    """Imports the scrapper on first use, so the scrapping dependencies are only loaded when needed"""
+    if name == 'JAScrapper':
+        from .scrapper import JAScrapper
+        return JAScrapper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
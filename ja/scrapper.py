@@ -5,12 +5,6 @@ import copy
 from datetime import datetime
 from typing import Dict, List
 
-from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.select import Select
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as ec
-
 import utilities
 from exceptions.files import RenameFileException
 from exceptions.scrapping import ElementNotFoundException, WaitTimeoutException
@@ -42,6 +36,10 @@ class JAScrapper(Scrapper):
         self.download_dir = download_dir
         self.exported_files = []
 
+    def reset(self) -> None:
+        """Clears the exported files of previous extractions"""
+        self.exported_files = []
+
     def extract(self, url=JA_URL, activities: List[str] = None, **kwargs):
         """
         Extracts the all the excel files from the JA
@@ -107,6 +105,11 @@ class JAScrapper(Scrapper):
             - activity_name: Value of the activity selector
         :return: The path to the excel file
         """
+        from selenium.common import NoSuchElementException, TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.select import Select
+        from selenium.webdriver.support.wait import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as ec
 
         # Load the page
         self.logger.info("Retrieving %s", kwargs['activity_name'])
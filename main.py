@@ -1,8 +1,23 @@
+import argparse
 import logging
 import os
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List
 
-from airbnb import AirbnbScrapper
-from ja import JAScrapper
+if TYPE_CHECKING:
+    from airbnb import AirbnbScrapper
+    from analysis import ListingsAnalysis
+    from scheduler import Scheduler
+
+DAY = 24 * 60 * 60
+""" Seconds in a day """
+
+JA_DIR = "./data/ja_raw"
+""" Default directory of the JA excel files """
+
+DATA_DIR = "."
+""" Default directory of the listings csv files """
 
 
 def start_logger(log_file: str = None) -> logging.Logger:
@@ -27,23 +42,249 @@ def start_logger(log_file: str = None) -> logging.Logger:
     return program_logger
 
 
-if __name__ == "__main__":
-    # Start logger
-    logger = start_logger()
-
-    # Firefox download options
-    download_dir = os.path.abspath("./data/ja_raw")
-    options = {
+def ja_download_options(download_dir: str) -> Dict:
+    """
+    Firefox download options for the JA excel files
+    :param download_dir: Directory where the files are downloaded
+    """
+    return {
         "browser.download.folderList": 2,
         "browser.download.dir": download_dir,  # TODO: Add from env
         "browser.helperApps.neverAsk.saveToDisk": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet,application/vnd.ms-excel",
     }
 
-    logger.info("Starting scrapping")
 
-    with JAScrapper("firefox", options, download_dir, ("--no-sandbox")) as scrapper:  # TODO: Add browser type from argument list
-        scrapper.extract(activities=["Vivienda turística de alojamiento rural"])
-    with AirbnbScrapper("firefox") as scrapper:
-        scrapper.extract()
+def build_scheduler(
+    download_dir: str,
+    interval: float = DAY,
+    browser: str = "firefox",
+    archive_dir: str = None,
+    data_dir: str = DATA_DIR,
+) -> "Scheduler":
+    """
+    Builds the scheduler with the default jobs: the scrappers and, halfway between two crawls, the ingestion of the
+    changes and the matching with the JA registry
+    :param download_dir: Directory where the JA files are downloaded
+    :param interval: Time in seconds between runs of each job
+    :param browser: Browser used by the scrappers
+    :param archive_dir: Directory of the page archive where the Airbnb pages are recorded (optional)
+    :param data_dir: Directory of the listings csv files
+    """
+    from airbnb import AirbnbScrapper
+    from ja import JAScrapper
+    from scheduler import Scheduler, Job
+    from utilities import PageArchive
+
+    options = ja_download_options(download_dir)
+    return Scheduler(
+        [
+            Job(
+                name="ja",
+                interval=interval,
+                action=JAScrapper.extract,
+                scrapper=lambda: JAScrapper(browser, options, download_dir, ("--no-sandbox",)),
+                kwargs={"activities": ["Vivienda turística de alojamiento rural"]},
+            ),
+            Job(
+                name="airbnb",
+                interval=interval,
+                action=extract_listings,
+                scrapper=lambda: AirbnbScrapper(browser, archive=PageArchive(archive_dir) if archive_dir else None),
+                kwargs={"directory": data_dir},
+            ),
+            Job(
+                name="ingest",
+                interval=interval,
+                action=ingest_directory,
+                kwargs={"directory": data_dir},
+                delay=interval / 2,
+            ),
+            Job(
+                name="match",
+                interval=interval,
+                action=match_directory,
+                kwargs={"directory": data_dir, "registry_dir": download_dir},
+                delay=interval / 2,
+            ),
+        ],
+        max_concurrent=2,
+    )
+
+
+def scrape(args: argparse.Namespace) -> None:
+    """
+    Runs the scrappers once, periodically (--daemon) or through a work queue (--queue)
+    :param args: Command line arguments
+    """
+    from utilities import PageArchive
+
+    download_dir = os.path.abspath(args.registry)
+    archive = PageArchive(args.archive) if args.archive else None
+
+    if args.queue:
+        from workqueue import SQLiteQueue, Worker, enqueue_crawl
 
-    logger.info("Ending scrapping")
+        queue = SQLiteQueue(args.queue)
+        if args.enqueue:
+            enqueue_crawl(queue, directory=args.data)
+        if args.worker:
+            with Worker(
+                queue,
+                args.browser,
+                download_dir=download_dir,
+                ja_options=ja_download_options(download_dir),
+                archive=archive,
+            ) as worker:
+                worker.run()
+    elif args.daemon:
+        with build_scheduler(download_dir, args.interval, args.browser, args.archive, args.data) as scheduler:
+            scheduler.run()
+    else:
+        from airbnb import AirbnbScrapper
+        from ja import JAScrapper
+
+        logger = logging.getLogger("TourismWatcher")
+        logger.info("Starting scrapping")
+
+        with JAScrapper(args.browser, ja_download_options(download_dir), download_dir, ("--no-sandbox",)) as scrapper:
+            scrapper.extract(activities=["Vivienda turística de alojamiento rural"])
+        with AirbnbScrapper(args.browser, archive=archive) as scrapper:
+            extract_listings(scrapper, args.data)
+
+        logger.info("Ending scrapping")
+
+
+def ingest(args: argparse.Namespace) -> None:
+    """
+    Adds the changes of the new snapshots of a directory to its change log (changes.csv)
+    :param args: Command line arguments
+    """
+    ingest_directory(args.directory)
+
+
+def match(args: argparse.Namespace) -> None:
+    """
+    Matches the permits of the listings of a directory with the JA registry (matches.csv)
+    :param args: Command line arguments
+    """
+    match_directory(args.directory, args.registry, args.date)
+
+
+def analyze(args: argparse.Namespace) -> None:
+    """
+    Computes the daily indicators of the snapshots of a directory (indicators.csv)
+    :param args: Command line arguments
+    """
+    analysis = load_analysis(args.directory, args.registry)
+    analysis.indicators.to_csv(os.path.join(args.directory, "indicators.csv"))
+
+
+def extract_listings(scrapper: "AirbnbScrapper", directory: str) -> None:
+    """
+    Extracts today's Airbnb listings into a directory (yyyy-mm-dd_listings.csv)
+    :param scrapper: Open Airbnb scrapper
+    :param directory: Directory of the listings csv files
+    """
+    from history.vars import SNAPSHOT_SUFFIX
+
+    scrapper.extract(filename=os.path.join(directory, datetime.now().strftime("%Y-%m-%d") + SNAPSHOT_SUFFIX))
+
+
+def ingest_directory(directory: str) -> None:
+    """
+    Adds the changes of the new snapshots of a directory to its change log (changes.csv)
+    :param directory: Directory of the listings csv files
+    """
+    from history import write_change_log, snapshot_files
+
+    write_change_log(snapshot_files(directory), os.path.join(directory, "changes.csv"))
+
+
+def match_directory(directory: str, registry_dir: str, date: str = None) -> None:
+    """
+    Matches the permits of the listings of a directory with the JA registry (matches.csv)
+    :param directory: Directory of the listings csv files
+    :param registry_dir: Directory of the JA excel files
+    :param date: Day (yyyy-mm-dd) to match (every day by default)
+    :throws RegistryNotLoaded: If there are no JA registry files
+    """
+    analysis = load_analysis(directory, registry_dir, required=True)
+    analysis.match_permits(date).to_csv(os.path.join(directory, "matches.csv"), index=False)
+
+
+def load_analysis(directory: str, registry_dir: str, required: bool = False) -> "ListingsAnalysis":
+    """
+    Loads the snapshots of a directory and the latest JA registry
+    :param directory: Directory of the listings csv files
+    :param registry_dir: Directory of the JA excel files
+    :param required: Whether to fail if there are no JA registry files (otherwise the analysis goes on without them)
+    :throws RegistryNotLoaded: If the registry is required and there are no JA registry files
+    """
+    from analysis import ListingsAnalysis, registry_files
+    from exceptions.analysis import RegistryNotLoaded
+
+    registry = registry_files(registry_dir) if os.path.isdir(registry_dir) else []
+    if not registry:
+        if required:
+            raise RegistryNotLoaded(f"No JA registry files found in '{registry_dir}'")
+        logging.getLogger("TourismWatcher").warning("No JA registry files found in '%s'", registry_dir)
+    analysis = ListingsAnalysis(registry)
+    analysis.add_directory(directory)
+    return analysis
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    """
+    Parses the command line arguments (without arguments, the scrappers are run once)
+    :param argv: Command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Tourism Watcher")
+    parser.add_argument("--log", metavar="FILE", help="Log file (standard error by default)")
+    commands = parser.add_subparsers(title="commands")
+
+    scrape_parser = commands.add_parser("scrape", help="Run the scrappers")
+    scrape_parser.add_argument("--browser", default="firefox", help="Browser used by the scrappers")
+    scrape_parser.add_argument(
+        "--registry", metavar="DIRECTORY", default=JA_DIR, help="Directory where the JA excel files are downloaded"
+    )
+    scrape_parser.add_argument("--archive", metavar="DIRECTORY", help="Record the Airbnb pages in a page archive")
+    scrape_parser.add_argument("--data", metavar="DIRECTORY", default=DATA_DIR, help="Directory of the listings csv files")
+    scrape_parser.add_argument("--daemon", action="store_true", help="Keep running the scrappers periodically")
+    scrape_parser.add_argument("--interval", type=float, default=DAY, help="Time in seconds between runs (daemon mode)")
+    scrape_parser.add_argument("--queue", metavar="PATH", help="Path to a SQLite work queue shared by the workers")
+    scrape_parser.add_argument("--enqueue", action="store_true", help="Add the tasks of a full crawl to the work queue")
+    scrape_parser.add_argument("--worker", action="store_true", help="Run the tasks of the work queue")
+    scrape_parser.set_defaults(command=scrape)
+
+    ingest_parser = commands.add_parser("ingest", help="Add the changes of the new snapshots to the change log")
+    ingest_parser.add_argument("directory", help="Directory of the yyyy-mm-dd_listings.csv files")
+    ingest_parser.set_defaults(command=ingest)
+
+    match_parser = commands.add_parser("match", help="Match the permits of the listings with the JA registry")
+    match_parser.add_argument("directory", help="Directory of the yyyy-mm-dd_listings.csv files")
+    match_parser.add_argument("--registry", metavar="DIRECTORY", default=JA_DIR, help="Directory of the JA excel files")
+    match_parser.add_argument("--date", help="Day to match (yyyy-mm-dd, every day by default)")
+    match_parser.set_defaults(command=match)
+
+    analyze_parser = commands.add_parser("analyze", help="Compute the daily indicators")
+    analyze_parser.add_argument("directory", help="Directory of the yyyy-mm-dd_listings.csv files")
+    analyze_parser.add_argument(
+        "--registry", metavar="DIRECTORY", default=JA_DIR, help="Directory of the JA excel files"
+    )
+    analyze_parser.set_defaults(command=analyze)
+
+    arguments = parser.parse_args(argv)
+    if not hasattr(arguments, "command"):
+        arguments = parser.parse_args([*argv, "scrape"])
+    if arguments.command is scrape:
+        if arguments.queue and not (arguments.enqueue or arguments.worker):
+            scrape_parser.error("--queue needs --enqueue and/or --worker")
+        if not arguments.queue and (arguments.enqueue or arguments.worker):
+            scrape_parser.error("--enqueue and --worker need --queue")
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+    start_logger(arguments.log)
+    arguments.command(arguments)
@@ -0,0 +1,13 @@
+"""
+Scheduler module
+
+Classes:
+    Scheduler: Class responsible for running jobs periodically, keeping their browser sessions open between runs
+
+    Job: Class containing the configuration of a scheduled job
+"""
+
+from .scheduler import Scheduler
+from .types import Job
+
+__all__ = ["Scheduler", "Job"]
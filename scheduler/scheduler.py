@@ -0,0 +1,182 @@
+import logging
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List
+
+from exceptions.browser import NullBrowserSession
+from scheduler.types import Job
+
+if TYPE_CHECKING:
+    from utilities import Scrapper
+
+
+class Scheduler:
+    """
+    Class responsible for running jobs periodically.
+
+    Every job runs in its own thread, at most 'max_concurrent' at the same time, starting with the most overdue ones.
+    A job is skipped when its previous run hasn't finished yet, and the scrappers of the jobs are kept open between
+    runs. When a run fails because the browser session of a reused scrapper is broken, it is retried once with a fresh
+    one.
+
+    Attributes:
+        logger          (logging.Logger): logger instance for the class
+        jobs            (Dict[str, Job]): Scheduled jobs by name
+        max_concurrent  (int): Maximum number of jobs running at the same time
+        tick            (float): Time in seconds between checks for pending jobs
+    """
+
+    logger = logging.getLogger("Scheduler")
+
+    def __init__(self, jobs: List[Job] = None, max_concurrent: int = 2, tick: float = 1) -> None:
+        self.jobs: Dict[str, Job] = {}
+        self.max_concurrent = max_concurrent
+        self.tick = tick
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._next_run: Dict[str, float] = {}
+        self._running: Dict[str, threading.Thread] = {}
+        self._sessions: Dict[str, "Scrapper"] = {}
+        self._sessions_lock = threading.Lock()
+        self._stop = threading.Event()
+        for job in jobs or []:
+            self.add_job(job)
+
+    def add_job(self, job: Job) -> None:
+        """
+        Adds a job to the scheduler. The job runs after its delay and then every 'interval' seconds
+        :param job: Job to add
+        """
+        if job.name in self.jobs:
+            raise ValueError(f"Job '{job.name}' already scheduled")
+        self.jobs[job.name] = job
+        self._next_run[job.name] = time.monotonic() + job.delay
+
+    def run(self) -> None:
+        """Runs the pending jobs until 'stop' is called or the process is interrupted"""
+        self.logger.info("Starting scheduler with %s jobs", len(self.jobs))
+        try:
+            while not self._stop.is_set():
+                self.run_pending()
+                self._stop.wait(self.tick)
+        except KeyboardInterrupt:
+            self.logger.info("Scheduler interrupted")
+        finally:
+            self.shutdown()
+
+    def run_pending(self) -> None:
+        """Starts the jobs that are due, most overdue first, if there are free slots"""
+        now = time.monotonic()
+        due = sorted((name for name in self.jobs if self._next_run[name] <= now), key=self._next_run.get)
+        for name in due:
+            job = self.jobs[name]
+            previous = self._running.get(name)
+            if previous is not None and previous.is_alive():
+                self.logger.warning("Skipping job %s, previous run still in progress", name)
+                self._next_run[name] = now + job.interval
+                continue
+            if not self._slots.acquire(blocking=False):
+                continue  # Retried on the next tick
+            self._next_run[name] = now + job.interval
+            thread = threading.Thread(target=self._run_job, args=(job,), name=name, daemon=True)
+            self._running[name] = thread
+            thread.start()
+
+    def stop(self) -> None:
+        """Stops the scheduler after the current tick"""
+        self._stop.set()
+
+    def shutdown(self) -> None:
+        """Waits for the running jobs and closes the open scrappers"""
+        self._stop.set()
+        for name, thread in self._running.items():
+            if thread.is_alive():
+                self.logger.info("Waiting for job %s to finish", name)
+                thread.join()
+        with self._sessions_lock:
+            for name in list(self._sessions):
+                self._close_session(name)
+
+    def _run_job(self, job: Job) -> None:
+        """
+        Runs a job once, reusing its scrapper if it has one
+        :param job: Job to run
+        """
+        self.logger.info("Running job %s", job.name)
+        start_time = time.monotonic()
+        try:
+            if job.scrapper is not None:
+                self._run_with_session(job)
+            else:
+                job.action(**job.kwargs)
+            self.logger.info("Job %s finished in %.0f seconds", job.name, time.monotonic() - start_time)
+        except Exception:
+            self.logger.exception("Job %s failed", job.name)
+        finally:
+            self._slots.release()
+
+    def _run_with_session(self, job: Job) -> None:
+        """
+        Runs a job with its scrapper. If the browser session of a scrapper kept open from a previous run fails (e.g.
+        the browser died in the meantime), the run is retried once with a fresh scrapper. Other errors (e.g. outdated
+        selectors) would happen again, so they aren't retried
+        :param job: Job with a scrapper
+        """
+        with self._sessions_lock:
+            reused = job.name in self._sessions
+        while True:
+            try:
+                scrapper = self._get_session(job)
+                scrapper.reset()
+                job.action(scrapper, **job.kwargs)
+                return
+            except Exception as error:
+                with self._sessions_lock:
+                    self._close_session(job.name)  # Start with a fresh session on the next run
+                if not reused or not _is_session_error(error):
+                    raise
+                self.logger.exception("Job %s failed with a reused scrapper, retrying with a fresh one", job.name)
+                reused = False
+
+    def _get_session(self, job: Job) -> "Scrapper":
+        """
+        Gets the open scrapper of a job, creating it if needed
+        :param job: Job with a scrapper
+        :return: The scrapper of the job
+        """
+        with self._sessions_lock:
+            if job.name not in self._sessions:
+                self._sessions[job.name] = job.scrapper()
+            return self._sessions[job.name]
+
+    def _close_session(self, name: str) -> None:
+        """
+        Closes the scrapper of a job, if open (the sessions lock must be held)
+        :param name: Name of the job
+        """
+        scrapper = self._sessions.pop(name, None)
+        if scrapper is None:
+            return
+        try:
+            scrapper.close()
+        except Exception:
+            self.logger.exception("Error closing the scrapper of job %s", name)
+
+    def __enter__(self) -> "Scheduler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+
+def _is_session_error(error: BaseException) -> bool:
+    """
+    Checks if an error comes from the browser session
+    :param error: Error raised by a job
+    :return: Whether the error is a Selenium error or a missing browser session
+    """
+    if isinstance(error, NullBrowserSession):
+        return True
+    # Selenium is only loaded by the scrappers, so its errors can only be raised if it's already imported
+    selenium = sys.modules.get("selenium.common.exceptions")
+    return selenium is not None and isinstance(error, selenium.WebDriverException)
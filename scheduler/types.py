@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from utilities import Scrapper
+
+
+@dataclass
+class Job:
+    """
+    Class representing a job run periodically by the scheduler
+
+    Attributes:
+        name (str): Unique name of the job
+        interval (float): Time in seconds between the start of two runs
+        action (Callable): Function run by the job. If the job has a scrapper, it is passed as first argument
+        scrapper (Callable): Function that creates the scrapper kept open between runs (optional)
+        kwargs (Dict): Keyword arguments passed to the action
+        delay (float): Time in seconds before the first run
+    """
+
+    name: str
+    interval: float
+    action: Callable[..., None]
+    scrapper: Optional[Callable[[], "Scrapper"]] = None
+    kwargs: Dict = field(default_factory=dict)
+    delay: float = 0
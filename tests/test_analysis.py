@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import ListingsAnalysis, registry_files
+from analysis.vars import (
+    LISTINGS,
+    HOSTS,
+    LISTINGS_PER_HOST,
+    MULTI_LISTING_HOSTS,
+    SHARED_PERMITS,
+    UNREGISTERED_RATE,
+)
+from exceptions.analysis import RegistryNotLoaded
+
+REGISTRY = pd.DataFrame({"NOMBRE": ["Casa 1", "Casa 2"], "REGISTRO": ["VFT/GR/00001", "VFT/GR/00002"]})
+
+
+@pytest.fixture
+def snapshots(tmp_path, write_snapshot):
+    write_snapshot(tmp_path, "2024-10-15", [
+        ("1", "a", "VFT/GR/00001"),
+        ("2", "a", "vft/gr/ 00003"),
+        ("3", "b", "VFT/GR/00003"),
+        ("3", "b", ""),  # Duplicated listing
+        ("4", "c", ""),
+    ])
+    write_snapshot(tmp_path, "2024-10-16", [("1", "a", "VFT/GR/00001"), ("5", "d", "VFT/GR/00002")])
+    return tmp_path
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(pd, "read_excel", lambda path, dtype=None: REGISTRY)
+    return ["2024-10-16_registry.xlsx"]
+
+
+def test_indicators(snapshots, registry):
+    analysis = ListingsAnalysis(registry)
+    indicators = analysis.add_directory(str(snapshots))
+
+    day = indicators.loc["2024-10-15"]
+    assert day[LISTINGS] == 4
+    assert day[HOSTS] == 3
+    assert day[LISTINGS_PER_HOST] == pytest.approx(4 / 3)
+    assert day[MULTI_LISTING_HOSTS] == pytest.approx(1 / 3)
+    assert day[SHARED_PERMITS] == 1
+    assert day[UNREGISTERED_RATE] == pytest.approx(3 / 4)
+    assert indicators.loc["2024-10-16", UNREGISTERED_RATE] == 0
+
+
+def test_snapshots_are_loaded_once(snapshots):
+    analysis = ListingsAnalysis()
+    analysis.add_directory(str(snapshots))
+    analysis.add_directory(str(snapshots))
+
+    assert len(analysis.indicators) == 2
+    assert len(analysis.listings) == 6
+
+
+def test_listings_are_categorical(snapshots):
+    analysis = ListingsAnalysis()
+    analysis.add_directory(str(snapshots))
+
+    assert isinstance(analysis.listings["HOST"].dtype, pd.CategoricalDtype)
+    assert isinstance(analysis.listings["PERMIT"].dtype, pd.CategoricalDtype)
+    assert analysis.listings_per_host("2024-10-15").iloc[0] == 2
+
+
+def test_header_only_snapshot(tmp_path, write_snapshot):
+    analysis = ListingsAnalysis()
+    path = write_snapshot(tmp_path, "2024-10-15", [])
+
+    day = analysis.add_snapshot(path)
+
+    assert day[LISTINGS] == 0
+    assert day[HOSTS] == 0
+    assert day[SHARED_PERMITS] == 0
+    assert np.isnan(day[LISTINGS_PER_HOST])
+    assert np.isnan(day[UNREGISTERED_RATE])
+
+
+def test_empty_snapshot_between_days(snapshots):
+    (snapshots / "2024-10-17_listings.csv").write_text("")
+    analysis = ListingsAnalysis()
+
+    indicators = analysis.add_directory(str(snapshots))
+
+    assert list(indicators[LISTINGS]) == [4, 2, 0]
+
+
+def test_unregistered_rate_unknown_without_registry(snapshots):
+    analysis = ListingsAnalysis()
+    indicators = analysis.add_directory(str(snapshots))
+
+    assert indicators[UNREGISTERED_RATE].isna().all()
+    with pytest.raises(RegistryNotLoaded):
+        analysis.match_permits()
+
+
+def test_load_registry_updates_indicators(snapshots, registry):
+    analysis = ListingsAnalysis()
+    analysis.add_directory(str(snapshots))
+
+    analysis.load_registry(registry)
+
+    assert analysis.indicators.loc["2024-10-15", UNREGISTERED_RATE] == pytest.approx(3 / 4)
+
+
+def test_match_permits(snapshots, registry):
+    analysis = ListingsAnalysis(registry)
+    analysis.add_directory(str(snapshots))
+
+    matches = analysis.match_permits("2024-10-15").set_index("ID")["REGISTERED"]
+
+    assert matches.to_dict() == {1: True, 2: False, 3: False, 4: False}
+
+
+def test_shared_permits(snapshots):
+    analysis = ListingsAnalysis()
+    analysis.add_directory(str(snapshots))
+
+    shared = analysis.shared_permits()
+
+    assert shared.to_dict() == {(pd.Timestamp("2024-10-15"), "VFT/GR/00003"): 2}
+
+
+def test_load_registry_from_excel(tmp_path, snapshots):
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "2024-10-16_registry.xlsx")
+    REGISTRY.to_excel(path, index=False)
+
+    analysis = ListingsAnalysis([path])
+
+    assert list(analysis.registry) == ["VFT/GR/00001", "VFT/GR/00002"]
+
+
+def test_registry_files_of_the_latest_day(tmp_path):
+    for name in ("2024-10-15_vft.xlsx", "2024-10-16_vft.xlsx", "2024-10-16_hut.xlsx", "exportacion.xlsx", "notes.txt"):
+        (tmp_path / name).touch()
+
+    assert registry_files(str(tmp_path)) == [
+        str(tmp_path / "2024-10-16_hut.xlsx"),
+        str(tmp_path / "2024-10-16_vft.xlsx"),
+    ]
@@ -0,0 +1,133 @@
+import csv
+import os
+
+import pytest
+
+import utilities.archive
+from airbnb import AirbnbScrapper
+from airbnb.vars import AIRBNB_URL, LISTING_URL, RESULTS_TAG
+from exceptions.files import ArchivedPageNotFound
+from utilities import PageArchive
+
+
+def objects(directory):
+    return sorted(os.listdir(os.path.join(directory, "objects")))
+
+
+def test_record_and_load(tmp_path):
+    archive = PageArchive(str(tmp_path))
+
+    digest = archive.record("https://a", "<p>a</p>")
+
+    assert objects(tmp_path) == [digest + ".html.gz"]
+    assert archive.load("https://a") == "<p>a</p>"
+    assert PageArchive(str(tmp_path)).load("https://a") == "<p>a</p>"
+    with pytest.raises(ArchivedPageNotFound):
+        archive.load("https://b")
+
+
+def test_same_content_is_stored_once(tmp_path):
+    archive = PageArchive(str(tmp_path))
+
+    archive.record("https://a", "<p>same</p>")
+    archive.record("https://b", "<p>same</p>")
+    archive.record("https://a", "<p>same</p>")
+
+    assert len(objects(tmp_path)) == 1
+    assert archive.load("https://b") == "<p>same</p>"
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path, monkeypatch):
+    archive = PageArchive(str(tmp_path))
+
+    def fail(source, destination):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(utilities.archive.os, "replace", fail)
+    with pytest.raises(OSError):
+        archive.record("https://a", "<p>a</p>")
+
+    assert objects(tmp_path) == []
+    assert not os.path.exists(tmp_path / "index.csv")
+
+
+def test_lookups_by_crawl_day(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.start_crawl("2024-10-15")
+    archive.record("https://a", "<p>old</p>")
+    archive.start_crawl("2024-10-16")
+    archive.record("https://a", "<p>new</p>")
+
+    assert PageArchive(str(tmp_path)).load("https://a") == "<p>new</p>"
+    assert PageArchive(str(tmp_path), day="2024-10-15").load("https://a") == "<p>old</p>"
+    with pytest.raises(ArchivedPageNotFound):
+        PageArchive(str(tmp_path), day="2024-10-17").load("https://a")
+
+
+def test_tagged_pages_of_the_latest_crawl(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.start_crawl("2024-10-15")
+    archive.record("https://a?page=1", "<p>1</p>", RESULTS_TAG)
+    archive.record("https://a?page=2", "<p>2</p>", RESULTS_TAG)
+    archive.start_crawl("2024-10-16")
+    archive.record("https://a?page=1", "<p>3</p>", RESULTS_TAG)
+    archive.record("https://b", "<p>b</p>")
+
+    assert PageArchive(str(tmp_path)).tagged(RESULTS_TAG) == ["<p>3</p>"]
+    assert PageArchive(str(tmp_path), day="2024-10-15").tagged(RESULTS_TAG) == ["<p>1</p>", "<p>2</p>"]
+    assert PageArchive(str(tmp_path), day="2024-10-17").tagged(RESULTS_TAG) == []
+
+
+def test_crawl_day_is_kept_past_midnight(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.start_crawl("2024-10-15")  # Started on the 15th, the pages are fetched later
+    archive.record(AIRBNB_URL, "<p>results</p>", RESULTS_TAG)
+    archive.record("https://a", "<p>a</p>")
+
+    replay = PageArchive(str(tmp_path), day="2024-10-15")
+
+    assert replay.tagged(RESULTS_TAG) == ["<p>results</p>"]
+    assert replay.load("https://a") == "<p>a</p>"
+
+
+def test_index_without_crawl_day_is_upgraded(tmp_path):
+    PageArchive(str(tmp_path)).record("https://a", "<p>a</p>")
+    with open(tmp_path / "index.csv", mode="r", newline="", encoding="UTF-8") as f:
+        rows = [row[:4] for row in csv.reader(f)]
+    rows[1][0] = "2024-10-15T23:59:00"
+    with open(tmp_path / "index.csv", mode="w", newline="", encoding="UTF-8") as f:
+        csv.writer(f).writerows(rows)
+
+    archive = PageArchive(str(tmp_path), day="2024-10-15")
+
+    assert archive.load("https://a") == "<p>a</p>"
+    with open(tmp_path / "index.csv", mode="r", newline="", encoding="UTF-8") as f:
+        assert next(csv.reader(f)) == utilities.archive.INDEX_HEADERS
+
+
+def test_replay_extraction(tmp_path, monkeypatch, results_page, listing_page):
+    archive = PageArchive(str(tmp_path / "archive"))
+    archive.start_crawl("2024-10-15")
+    archive.record(AIRBNB_URL, results_page([1, 2]), RESULTS_TAG)
+    archive.record(AIRBNB_URL + "&page=2", results_page([3], next_page=False), RESULTS_TAG)
+    archive.record(LISTING_URL.format(1), listing_page("ana", "VFT/GR/1"))
+    archive.record(LISTING_URL.format(2), listing_page("ana"))
+    monkeypatch.chdir(tmp_path)
+
+    replay = PageArchive(str(tmp_path / "archive"), day="2024-10-15")
+    with AirbnbScrapper("firefox", archive=replay, replay=True) as scrapper:
+        scrapper.extract(health_check=False)
+
+    with open(tmp_path / "2024-10-15_listings.csv", mode="r", newline="", encoding="UTF-8") as f:
+        assert list(csv.reader(f)) == [
+            ["URL", "ANFITRION", "PERMISO"],
+            [LISTING_URL.format(1), "ana", "VFT/GR/1"],
+            [LISTING_URL.format(2), "ana", ""],
+            [LISTING_URL.format(3), "", ""],  # Not archived
+        ]
+
+
+def test_replay_without_archive_day_needs_filename(tmp_path):
+    with AirbnbScrapper("firefox", archive=PageArchive(str(tmp_path)), replay=True) as scrapper:
+        with pytest.raises(ValueError):
+            scrapper.extract(health_check=False)
@@ -0,0 +1,133 @@
+import csv
+
+import pytest
+
+import history.diff
+from history import Snapshot, diff_snapshots, write_change_log, snapshot_files
+from history.types import Change
+from history.vars import (
+    CHANGE_LOG_HEADERS,
+    NEW_LISTING,
+    DELISTED,
+    PERMIT_ADDED,
+    PERMIT_REMOVED,
+    PERMIT_CHANGED,
+    HOST_CHANGED,
+    HOST_GAINED,
+    HOST_LOST,
+)
+
+
+def read_log(path):
+    with open(path, mode="r", newline="", encoding="UTF-8") as f:
+        return list(csv.reader(f))
+
+
+def test_snapshot_rows_sorted_and_unique(tmp_path, write_snapshot):
+    path = write_snapshot(tmp_path, "2024-10-15", [("3", "a", ""), ("1", "b", ""), ("3", "a", "VFT/GR/1"), ("2", "", "")])
+
+    with Snapshot(path, chunk_size=2) as snapshot:
+        assert list(snapshot.rows()) == [("1", "b", ""), ("2", "", ""), ("3", "a", "VFT/GR/1")]
+
+
+def test_diff_snapshots(tmp_path, write_snapshot):
+    old = write_snapshot(tmp_path, "2024-10-15", [
+        ("1", "a", ""),
+        ("2", "a", "VFT/GR/2"),
+        ("3", "b", "VFT/GR/3"),
+        ("4", "b", "VFT/GR/4"),
+        ("5", "c", ""),
+    ])
+    new = write_snapshot(tmp_path, "2024-10-16", [
+        ("1", "a", "VFT/GR/1"),
+        ("2", "a", ""),
+        ("3", "b", "VFT/GR/33"),
+        ("4", "d", "VFT/GR/4"),
+        ("6", "a", ""),
+    ])
+
+    with Snapshot(old, chunk_size=2) as old_snapshot, Snapshot(new, chunk_size=2) as new_snapshot:
+        changes = list(diff_snapshots(old_snapshot, new_snapshot))
+
+    date = "2024-10-16"
+    assert changes == [
+        Change(date, PERMIT_ADDED, "1", new="VFT/GR/1"),
+        Change(date, PERMIT_REMOVED, "2", old="VFT/GR/2"),
+        Change(date, PERMIT_CHANGED, "3", "VFT/GR/3", "VFT/GR/33"),
+        Change(date, HOST_CHANGED, "4", "b", "d"),
+        Change(date, DELISTED, "5", old=""),
+        Change(date, NEW_LISTING, "6", new=""),
+        Change(date, HOST_GAINED, "a", "2", "3"),
+        Change(date, HOST_LOST, "b", "2", "1"),
+        Change(date, HOST_LOST, "c", "1", "0"),
+        Change(date, HOST_GAINED, "d", "0", "1"),
+    ]
+
+
+def test_permits_written_differently_are_unchanged(tmp_path, write_snapshot):
+    old = write_snapshot(tmp_path, "2024-10-15", [("1", "a", "vft/gr/ 00001"), ("2", "a", "VFT/GR/2")])
+    new = write_snapshot(tmp_path, "2024-10-16", [("1", "a", "VFT/GR/00001"), ("2", "a", "VFT/GR/3")])
+
+    with Snapshot(old) as old_snapshot, Snapshot(new) as new_snapshot:
+        changes = list(diff_snapshots(old_snapshot, new_snapshot))
+
+    assert changes == [Change("2024-10-16", PERMIT_CHANGED, "2", "VFT/GR/2", "VFT/GR/3")]
+
+
+def test_write_change_log(tmp_path, write_snapshot):
+    write_snapshot(tmp_path, "2024-10-15", [("1", "a", "")])
+    write_snapshot(tmp_path, "2024-10-16", [("1", "a", ""), ("2", "a", "")])
+    write_snapshot(tmp_path, "2024-10-17", [("2", "a", "")])
+    output = str(tmp_path / "changes.csv")
+
+    assert write_change_log(snapshot_files(str(tmp_path)), output) == 4
+
+    assert read_log(output) == [
+        CHANGE_LOG_HEADERS,
+        ["2024-10-16", NEW_LISTING, "2", "", ""],
+        ["2024-10-16", HOST_GAINED, "a", "1", "2"],
+        ["2024-10-17", DELISTED, "1", "", ""],
+        ["2024-10-17", HOST_LOST, "a", "2", "1"],
+    ]
+
+
+def test_write_change_log_incremental(tmp_path, write_snapshot):
+    write_snapshot(tmp_path, "2024-10-15", [("1", "a", "")])
+    write_snapshot(tmp_path, "2024-10-16", [("1", "a", ""), ("2", "a", "")])
+    output = str(tmp_path / "changes.csv")
+    write_change_log(snapshot_files(str(tmp_path)), output)
+
+    assert write_change_log(snapshot_files(str(tmp_path)), output) == 0
+
+    write_snapshot(tmp_path, "2024-10-17", [("1", "a", "X"), ("2", "a", "")])
+    assert write_change_log(snapshot_files(str(tmp_path)), output) == 1
+    assert read_log(output)[1:] == [
+        ["2024-10-16", NEW_LISTING, "2", "", ""],
+        ["2024-10-16", HOST_GAINED, "a", "1", "2"],
+        ["2024-10-17", PERMIT_ADDED, "1", "", "X"],
+    ]
+
+
+def test_write_change_log_skips_interrupted_day(tmp_path, monkeypatch, write_snapshot):
+    write_snapshot(tmp_path, "2024-10-15", [("1", "a", "")])
+    write_snapshot(tmp_path, "2024-10-16", [("1", "a", "X")])
+    write_snapshot(tmp_path, "2024-10-17", [("1", "a", ""), ("2", "a", "")])
+    output = str(tmp_path / "changes.csv")
+
+    diff = history.diff.diff_snapshots
+
+    def interrupted(old, new):
+        for i, change in enumerate(diff(old, new)):
+            if new.date == "2024-10-17" and i == 1:
+                raise RuntimeError("Interrupted")
+            yield change
+
+    monkeypatch.setattr(history.diff, "diff_snapshots", interrupted)
+    with pytest.raises(RuntimeError):
+        write_change_log(snapshot_files(str(tmp_path)), output)
+    assert [row[0] for row in read_log(output)[1:]] == ["2024-10-16"]
+
+    # The interrupted day is compared again on the next run
+    monkeypatch.setattr(history.diff, "diff_snapshots", diff)
+    assert write_change_log(snapshot_files(str(tmp_path)), output) == 3
+    assert [row[0] for row in read_log(output)[1:]] == ["2024-10-16", "2024-10-17", "2024-10-17", "2024-10-17"]
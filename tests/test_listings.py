@@ -0,0 +1,53 @@
+from airbnb import ListingCollection, ListingData
+
+
+def collection():
+    return ListingCollection([
+        ListingData("https://www.airbnb.es/rooms/1?adults=1", "a", "VFT/GR/1"),
+        ListingData("https://example.com/other"),
+        ListingData("https://www.airbnb.es/rooms/plus/3", None, "VFT/GR/1"),
+    ])
+
+
+def test_urls_are_canonical():
+    listings = collection()
+
+    assert [listings.url(i) for i in range(len(listings))] == [
+        "https://www.airbnb.es/rooms/1",
+        "https://example.com/other",
+        "https://www.airbnb.es/rooms/3",
+    ]
+    assert list(listings.to_lists())[0] == ["https://www.airbnb.es/rooms/1", "a", "VFT/GR/1"]
+
+
+def test_items_are_copies():
+    listings = collection()
+
+    listings[0].host = "b"
+    assert listings[0].host == "a"
+
+    listing = listings[0]
+    listing.host = "b"
+    listings[0] = listing
+    assert listings[0].host == "b"
+
+
+def test_slices():
+    listings = collection()
+
+    tail = listings[1:]
+    assert isinstance(tail, ListingCollection)
+    assert list(tail) == list(listings)[1:]
+    assert list(listings[::-1]) == list(listings)[::-1]
+
+    tail.append(ListingData("https://www.airbnb.es/rooms/4", "c"))
+    tail.append(ListingData("https://example.com/another", "a"))
+    assert len(listings) == 3
+    assert listings[-1] == ListingData("https://www.airbnb.es/rooms/3", None, "VFT/GR/1")
+    assert list(tail.to_lists())[-2:] == [
+        ["https://www.airbnb.es/rooms/4", "c", None],
+        ["https://example.com/another", "a", None],
+    ]
+    listings.append(ListingData("https://example.com/third", "d"))
+    assert listings[-1] == ListingData("https://example.com/third", "d")
+    assert tail[-1] == ListingData("https://example.com/another", "a")
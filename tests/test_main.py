@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+
+STARTUP_BUDGET = 0.25
+""" Maximum time in seconds to import main (it takes about 0.01 s without Selenium and 0.9 s with it) """
+
+STARTUP_CHECK = """
+import sys
+import time
+
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+
+import airbnb, ja, utilities, workqueue, scheduler, history
+
+for argv in (["ingest", sys.argv[1]], ["analyze", sys.argv[1], "--registry", sys.argv[1]]):
+    arguments = main.parse_arguments(argv)
+    arguments.command(arguments)
+
+print(elapsed)
+print(sorted(name for name in sys.modules if name.split(".")[0] == "selenium"))
+"""
+
+
+def test_scrape_is_the_default_command():
+    arguments = main.parse_arguments([])
+
+    assert arguments.command is main.scrape
+    assert arguments.data == main.DATA_DIR
+
+
+@pytest.mark.parametrize("argv", [["scrape", "--queue", "queue.db"], ["scrape", "--worker"], ["scrape", "--enqueue"]])
+def test_queue_options_need_each_other(argv, capsys):
+    with pytest.raises(SystemExit):
+        main.parse_arguments(argv)
+    assert "error" in capsys.readouterr().err
+
+
+def test_queue_options():
+    arguments = main.parse_arguments(["scrape", "--queue", "queue.db", "--worker", "--data", "data"])
+
+    assert (arguments.queue, arguments.worker, arguments.enqueue, arguments.data) == ("queue.db", True, False, "data")
+
+
+@pytest.mark.parametrize("command", ["scrape", "match", "analyze"])
+def test_registry_option(command):
+    argv = [command] if command == "scrape" else [command, "data"]
+
+    assert main.parse_arguments([*argv, "--registry", "registry"]).registry == "registry"
+    assert main.parse_arguments(argv).registry == main.JA_DIR
+
+
+def test_commands_without_browser_dont_load_selenium(tmp_path, write_snapshot):
+    write_snapshot(tmp_path, "2024-10-15", [])
+    write_snapshot(tmp_path, "2024-10-16", [("1", "a", "")])
+
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_CHECK, str(tmp_path)],
+        cwd=os.path.dirname(os.path.abspath(main.__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    elapsed, modules = result.stdout.splitlines()[-2:]
+    assert modules == "[]"
+    assert float(elapsed) < STARTUP_BUDGET
+    assert (tmp_path / "changes.csv").exists()
+    assert (tmp_path / "indicators.csv").exists()
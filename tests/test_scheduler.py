@@ -0,0 +1,206 @@
+import threading
+import time
+
+import pytest
+
+from exceptions.browser import NullBrowserSession
+from exceptions.scrapping import SelectorHealthException
+from scheduler import Scheduler, Job
+
+
+class FakeScrapper:
+    """Scrapper that records how it's used"""
+
+    opened = []
+
+    def __init__(self) -> None:
+        self.resets = 0
+        self.closed = False
+        FakeScrapper.opened.append(self)
+
+    def reset(self) -> None:
+        self.resets += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def clear_scrappers():
+    FakeScrapper.opened = []
+
+
+def wait_for(condition, timeout: float = 2) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.005)
+
+
+def wait_idle(scheduler: Scheduler) -> None:
+    wait_for(lambda: not any(thread.is_alive() for thread in scheduler._running.values()))
+
+
+def test_jobs_run_periodically():
+    runs = []
+    scheduler = Scheduler([Job("a", interval=0.02, action=lambda: runs.append(time.monotonic()))], tick=0.005)
+
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    wait_for(lambda: len(runs) >= 3)
+    scheduler.stop()
+    thread.join()
+
+    assert runs[1] - runs[0] >= 0.015
+
+
+def test_running_job_is_skipped():
+    release = threading.Event()
+    runs = []
+
+    def action():
+        runs.append(1)
+        release.wait()
+
+    scheduler = Scheduler([Job("a", interval=0, action=action)], tick=0.005)
+    scheduler.run_pending()
+    wait_for(lambda: runs)
+    scheduler.run_pending()
+    scheduler.run_pending()
+    release.set()
+    wait_idle(scheduler)
+
+    assert len(runs) == 1
+
+
+def test_concurrency_limit():
+    release = threading.Event()
+    running = []
+
+    def action(name):
+        running.append(name)
+        release.wait()
+
+    scheduler = Scheduler(
+        [Job(name, interval=100, action=action, kwargs={"name": name}) for name in ("a", "b", "c")],
+        max_concurrent=2,
+    )
+    scheduler.run_pending()
+    wait_for(lambda: len(running) == 2)
+    scheduler.run_pending()
+    time.sleep(0.02)
+    assert len(running) == 2  # No free slots
+
+    release.set()
+    wait_idle(scheduler)
+    scheduler.run_pending()  # The waiting job starts when a slot is free
+    wait_idle(scheduler)
+    assert sorted(running) == ["a", "b", "c"]
+
+
+def test_most_overdue_job_first():
+    runs = []
+    scheduler = Scheduler(max_concurrent=1)
+    for name in ("a", "b", "c"):
+        scheduler.add_job(Job(name, interval=100, action=lambda name=name: runs.append(name)))
+    scheduler._next_run["c"] -= 10
+    scheduler._next_run["b"] -= 5
+
+    for _ in range(3):
+        scheduler.run_pending()
+        wait_idle(scheduler)
+
+    assert runs == ["c", "b", "a"]
+
+
+def test_delayed_job():
+    runs = []
+    scheduler = Scheduler([Job("a", interval=100, action=lambda: runs.append(1), delay=0.05)])
+
+    scheduler.run_pending()
+    wait_idle(scheduler)
+    assert runs == []
+
+    time.sleep(0.06)
+    scheduler.run_pending()
+    wait_idle(scheduler)
+    assert runs == [1]
+
+
+def test_scrapper_is_reused():
+    scheduler = Scheduler([Job("a", interval=0, action=lambda scrapper: None, scrapper=FakeScrapper)])
+
+    for _ in range(2):
+        scheduler.run_pending()
+        wait_idle(scheduler)
+    scheduler.shutdown()
+
+    assert len(FakeScrapper.opened) == 1
+    assert FakeScrapper.opened[0].resets == 2
+    assert FakeScrapper.opened[0].closed
+
+
+def test_broken_session_is_retried_with_fresh_scrapper():
+    runs = []
+
+    def action(scrapper):
+        runs.append(scrapper)
+        if len(runs) == 2:
+            raise NullBrowserSession()  # The browser died between runs
+
+    scheduler = Scheduler([Job("a", interval=0, action=action, scrapper=FakeScrapper)])
+    for _ in range(2):
+        scheduler.run_pending()
+        wait_idle(scheduler)
+
+    assert len(runs) == 3
+    assert runs[1] is runs[0] and runs[1].closed
+    assert runs[2] is not runs[0] and not runs[2].closed
+
+
+def test_other_errors_are_not_retried():
+    runs = []
+
+    def action(scrapper):
+        runs.append(scrapper)
+        if len(runs) == 2:
+            raise SelectorHealthException("css_listings", 0.0, 1.0)
+
+    scheduler = Scheduler([Job("a", interval=0, action=action, scrapper=FakeScrapper)])
+    for _ in range(3):
+        scheduler.run_pending()
+        wait_idle(scheduler)
+
+    assert len(runs) == 3
+    assert len(FakeScrapper.opened) == 2  # Reopened on the next run
+
+
+def test_fresh_session_is_not_retried():
+    runs = []
+
+    def action(scrapper):
+        runs.append(scrapper)
+        raise NullBrowserSession()
+
+    scheduler = Scheduler([Job("a", interval=100, action=action, scrapper=FakeScrapper)])
+    scheduler.run_pending()
+    wait_idle(scheduler)
+
+    assert len(runs) == 1
+
+
+def test_webdriver_error_is_retried():
+    exceptions = pytest.importorskip("selenium.common.exceptions")
+    runs = []
+
+    def action(scrapper):
+        runs.append(scrapper)
+        if len(runs) == 2:
+            raise exceptions.WebDriverException("Browser closed")
+
+    scheduler = Scheduler([Job("a", interval=0, action=action, scrapper=FakeScrapper)])
+    for _ in range(2):
+        scheduler.run_pending()
+        wait_idle(scheduler)
+
+    assert len(runs) == 3
@@ -0,0 +1,155 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from airbnb import AirbnbScrapper
+from airbnb.vars import (
+    AIRBNB_URL,
+    LISTING_URL,
+    RESULTS_TAG,
+    RESULTS_PAGE_SIZE,
+    CSS_NEXT_PAGE,
+    CSS_HOSTNAME,
+    CSS_PERMIT,
+)
+from exceptions.scrapping import SelectorHealthException
+from utilities import PageArchive
+
+DAY = "2024-10-15"
+
+FULL_PAGE = list(range(1, RESULTS_PAGE_SIZE + 1))
+
+
+@pytest.fixture
+def record(tmp_path):
+    """Records a crawl (results pages and listing pages) and returns a scrapper that replays it"""
+    scrappers = []
+
+    def record_crawl(pages, listings=None):
+        archive = PageArchive(str(tmp_path / "archive"))
+        archive.start_crawl(DAY)
+        for i, page in enumerate(pages):
+            archive.record(AIRBNB_URL + f"&page={i}", page, RESULTS_TAG)
+        for key, html in (listings or {}).items():
+            archive.record(LISTING_URL.format(key), html)
+        scrapper = AirbnbScrapper("firefox", archive=PageArchive(str(tmp_path / "archive"), day=DAY), replay=True)
+        scrappers.append(scrapper)
+        return scrapper
+
+    yield record_crawl
+    for scrapper in scrappers:
+        scrapper.close()
+
+
+def listings(listing_page, ids):
+    return {key: listing_page(f"host{key}", f"VFT/GR/{key}") for key in ids}
+
+
+def soup(html):
+    return BeautifulSoup(html, features="html.parser")
+
+
+def test_healthy_selectors(record, results_page, listing_page):
+    scrapper = record([results_page(FULL_PAGE)], listings(listing_page, FULL_PAGE))
+
+    selectors = scrapper.check_selectors(page=scrapper.first_results_page(AIRBNB_URL, 0))
+
+    assert selectors["css_next_page"] == CSS_NEXT_PAGE
+    assert selectors["css_hostname"] == CSS_HOSTNAME
+
+
+def test_missing_next_page_on_full_page_fails(record, results_page):
+    scrapper = record([])
+
+    with pytest.raises(SelectorHealthException) as error:
+        scrapper.check_results_selectors(soup(results_page(FULL_PAGE, next_page=False)))
+    assert error.value.selector == "css_next_page"
+
+
+def test_missing_next_page_on_single_page_passes(record, results_page):
+    scrapper = record([])
+
+    selectors = scrapper.check_results_selectors(soup(results_page([1, 2, 3], next_page=False)))
+
+    assert selectors["css_next_page"] == CSS_NEXT_PAGE
+
+
+def test_next_page_alternative(record, results_page):
+    scrapper = record([])
+    page = soup(results_page(FULL_PAGE))
+
+    selectors = scrapper.check_results_selectors(
+        page, css_next_page="stale", alternatives={"css_next_page": ["other", CSS_NEXT_PAGE]}
+    )
+
+    assert selectors["css_next_page"] == CSS_NEXT_PAGE
+
+
+def test_stale_listings_selector_fails(record, results_page):
+    scrapper = record([])
+
+    with pytest.raises(SelectorHealthException) as error:
+        scrapper.check_results_selectors(soup(results_page(FULL_PAGE)), css_listings="stale")
+    assert error.value.selector == "css_listings"
+
+
+def test_stale_host_selector_fails(record, results_page, listing_page):
+    scrapper = record([results_page([1, 2])], {1: listing_page(permit="VFT/GR/1"), 2: listing_page()})
+
+    with pytest.raises(SelectorHealthException) as error:
+        scrapper.check_selectors(page=scrapper.first_results_page(AIRBNB_URL, 0))
+    assert error.value.selector == "host_selector"
+
+
+def test_permit_threshold_allows_missing_permits(record, results_page, listing_page):
+    pages = {key: listing_page(f"host{key}") for key in range(1, 6)}
+    pages[1] = listing_page("host1", "VFT/GR/1")
+    scrapper = record([results_page(range(1, 6))], pages)
+
+    selectors = scrapper.check_selectors(page=scrapper.first_results_page(AIRBNB_URL, 0))
+
+    assert selectors["css_permit"] == CSS_PERMIT
+
+
+def test_extract_paginates_with_checked_selector(record, results_page, listing_page, monkeypatch, tmp_path):
+    scrapper = record(
+        [results_page(FULL_PAGE), results_page([19], next_page=False)], listings(listing_page, FULL_PAGE + [19])
+    )
+    calls = []
+    extract_soup = scrapper.extract_soup
+
+    def spy(url, load_time, click_time, css_next_page, first_page=None):
+        calls.append(css_next_page)
+        extract_soup(url, load_time, click_time, css_next_page, first_page)
+
+    monkeypatch.setattr(scrapper, "extract_soup", spy)
+    filename = str(tmp_path / "listings.csv")
+
+    scrapper.extract(
+        filename=filename, load_time=0, css_next_page="stale", alternatives={"css_next_page": [CSS_NEXT_PAGE]}
+    )
+
+    assert calls == [CSS_NEXT_PAGE]
+    assert len(scrapper.listings) == RESULTS_PAGE_SIZE + 1
+
+
+def test_extract_fails_before_paginating(record, results_page, monkeypatch, tmp_path):
+    scrapper = record([results_page(FULL_PAGE, next_page=False)])
+    monkeypatch.setattr(scrapper, "extract_soup", lambda *args: pytest.fail("Paginated with a stale selector"))
+    filename = str(tmp_path / "listings.csv")
+
+    with pytest.raises(SelectorHealthException):
+        scrapper.extract(filename=filename, load_time=0)
+    assert not os.path.exists(filename)
+
+
+def test_extract_uses_alternative_listing_selector(record, results_page, listing_page, tmp_path):
+    scrapper = record([results_page([1, 2])], listings(listing_page, [1, 2]))
+    filename = str(tmp_path / "listings.csv")
+
+    scrapper.extract(
+        filename=filename, load_time=0, css_hostname="stale", alternatives={"css_hostname": [CSS_HOSTNAME]}
+    )
+
+    assert [listing.host for listing in scrapper.listings] == ["host1", "host2"]
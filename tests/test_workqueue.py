@@ -0,0 +1,141 @@
+import csv
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from airbnb import AirbnbScrapper
+from airbnb.vars import AIRBNB_URL, LISTING_URL, RESULTS_TAG
+from utilities import PageArchive
+from workqueue import SQLiteQueue, Worker, enqueue_crawl
+from workqueue.vars import AIRBNB_RESULTS, AIRBNB_LISTING
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteQueue(str(tmp_path / "queue.db"), max_attempts=2)
+
+
+def test_lease_returns_tasks_in_order(queue):
+    queue.put_many("kind", [{"n": 1}, {"n": 2}])
+
+    first = queue.lease("w1", 60)
+    second = queue.lease("w2", 60)
+
+    assert (first.payload, first.worker, first.attempts) == ({"n": 1}, "w1", 1)
+    assert second.payload == {"n": 2}
+    assert queue.lease("w3", 60) is None
+    assert queue.counts()["leased"] == 2
+
+
+def test_lease_filters_kinds(queue):
+    queue.put("a", {"n": 1})
+    queue.put("b", {"n": 2})
+
+    assert queue.lease("w1", 60, kinds=["b"]).kind == "b"
+    assert queue.lease("w1", 60, kinds=["b"]) is None
+
+
+def test_ack_marks_task_done(queue):
+    queue.put("kind", {"n": 1})
+    task = queue.lease("w1", 60)
+
+    assert queue.ack(task)
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+    assert queue.lease("w1", 60) is None
+
+
+def test_release_retries_until_max_attempts(queue):
+    queue.put("kind", {"n": 1})
+
+    queue.release(queue.lease("w1", 60))
+    assert queue.counts()["pending"] == 1
+
+    task = queue.lease("w1", 60)
+    assert task.attempts == 2
+    queue.release(task)
+    assert queue.counts()["failed"] == 1
+    assert queue.lease("w1", 60) is None
+
+
+def test_expired_lease_is_taken_by_another_worker(queue):
+    queue.put("kind", {"n": 1})
+    expired = queue.lease("w1", -1)
+
+    task = queue.lease("w2", 60)
+
+    assert task.id == expired.id
+    assert task.worker == "w2"
+    assert not queue.ack(expired)  # Lease lost
+    assert queue.ack(task)
+
+
+def test_expired_lease_without_attempts_fails(queue):
+    queue.put("kind", {"n": 1})
+    queue.lease("w1", -1)
+    queue.lease("w2", -1)
+    time.sleep(0.01)
+
+    assert queue.lease("w3", 60) is None
+    assert queue.counts()["failed"] == 1
+
+
+def test_duplicates_are_ignored(queue):
+    queue.put_many("kind", [{"n": 1, "crawl": "c1"}, {"crawl": "c1", "n": 1}])
+    queue.ack(queue.lease("w1", 60))
+
+    queue.put("kind", {"n": 1, "crawl": "c1"})
+
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_new_crawl_is_enqueued_again(queue):
+    queue.put("kind", {"n": 1, "crawl": "c1"})
+    queue.ack(queue.lease("w1", 60))
+
+    queue.put("kind", {"n": 1, "crawl": "c2"})
+
+    task = queue.lease("w1", 60)
+    assert task.payload == {"n": 1, "crawl": "c2"}
+
+
+def test_enqueue_crawl_once_per_crawl(queue):
+    enqueue_crawl(queue, urls=["https://a", "https://b"], activities=["x"], crawl="c1")
+    enqueue_crawl(queue, urls=["https://a", "https://b"], activities=["x"], crawl="c1")
+    assert queue.counts()["pending"] == 3
+
+    enqueue_crawl(queue, urls=["https://a"], activities=["x"], crawl="c2")
+    assert queue.counts()["pending"] == 5
+    assert queue.lease("w1", 60, kinds=[AIRBNB_RESULTS]).payload["crawl"] == "c1"
+
+
+def test_enqueue_crawl_saves_to_the_crawl_snapshot(queue, tmp_path):
+    enqueue_crawl(queue, urls=["https://a"], activities=["x"], directory=str(tmp_path))
+
+    payload = queue.lease("w1", 60, kinds=[AIRBNB_RESULTS]).payload
+    day = datetime.now().strftime("%Y-%m-%d")
+    assert payload["day"] == day
+    assert payload["filename"] == os.path.join(str(tmp_path), day + "_listings.csv")
+
+
+def test_worker_runs_a_crawl(queue, tmp_path, results_page, listing_page):
+    archive = PageArchive(str(tmp_path / "archive"))
+    archive.start_crawl("2024-10-15")
+    archive.record(AIRBNB_URL, results_page([1, 2, 1]), RESULTS_TAG)
+    archive.record(LISTING_URL.format(1), listing_page("ana", "VFT/GR/1"))
+    archive.record(LISTING_URL.format(2), listing_page("ana", "VFT/GR/2"))
+    replay = PageArchive(str(tmp_path / "archive"), day="2024-10-15")
+    enqueue_crawl(queue, urls=[AIRBNB_URL, AIRBNB_URL + "&shard=2"], activities=["x"], directory=str(tmp_path))
+
+    with Worker(queue, "firefox", kinds=[AIRBNB_RESULTS, AIRBNB_LISTING], load_time=0) as worker:
+        worker._airbnb = AirbnbScrapper("firefox", archive=replay, replay=True)
+        assert worker.run(stop_when_empty=True) == 4  # Two shards and two listings found by both
+
+    snapshot = os.path.join(str(tmp_path), datetime.now().strftime("%Y-%m-%d") + "_listings.csv")
+    with open(snapshot, mode="r", newline="", encoding="UTF-8") as f:
+        assert sorted(csv.reader(f)) == [
+            ["URL", "ANFITRION", "PERMISO"],
+            [LISTING_URL.format(1), "ana", "VFT/GR/1"],
+            [LISTING_URL.format(2), "ana", "VFT/GR/2"],
+        ]
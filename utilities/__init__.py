@@ -1,5 +1,13 @@
 from .types import Browser, WebDriver
 from .utils import start_selenium, rename_file
-from .scrapper import Scrapper
+from .archive import PageArchive
 
-__all__ = ['Browser', 'WebDriver', 'start_selenium', 'rename_file', 'Scrapper']
\ No newline at end of file
+__all__ = ['Browser', 'WebDriver', 'start_selenium', 'rename_file', 'PageArchive', 'Scrapper']
+
+
+def __getattr__(name: str):
+    """Imports the scrapper on first use, so the scrapping dependencies are only loaded when needed"""
+    if name == 'Scrapper':
+        from .scrapper import Scrapper
+        return Scrapper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,173 @@
+import csv
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from exceptions.files import ArchivedPageNotFound
+
+INDEX_FILENAME = "index.csv"
+""" Name of the archive index file """
+
+INDEX_HEADERS = ["TIMESTAMP", "URL", "SHA256", "TAG", "DAY"]
+""" Headers of the archive index file """
+
+
+class PageArchive:
+    """
+    Archive of fetched HTML pages, compressed and de-duplicated by content hash.
+
+    The pages are stored as ``objects/<sha256>.html.gz`` inside the archive directory, and every fetch is
+    recorded in ``index.csv`` with its timestamp, URL, content hash, an optional tag (e.g. 'results') and the day
+    of its crawl. The crawl day is the day the crawl started (see 'start_crawl'), so a crawl that runs past midnight
+    is replayed as a whole.
+
+    Attributes:
+        logger      (logging.Logger): logger instance for the class
+        directory   (str): Root directory of the archive
+        day         (str): Crawl day (yyyy-mm-dd) the lookups are restricted to (optional)
+    """
+
+    logger = logging.getLogger("PageArchive")
+
+    def __init__(self, directory: str, day: str = None) -> None:
+        self.directory = directory
+        self.day = day
+        self._objects_dir = os.path.join(directory, "objects")
+        self._index_path = os.path.join(directory, INDEX_FILENAME)
+        self._entries: Optional[List[Dict[str, str]]] = None
+        self._by_url: Dict[str, str] = {}
+        self._crawl_day: Optional[str] = None
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._upgrade_index()
+
+    def start_crawl(self, day: str = None) -> str:
+        """
+        Sets the crawl day of the pages recorded from now on
+        :param day: Day (yyyy-mm-dd) of the crawl (today by default)
+        :return: The crawl day
+        """
+        self._crawl_day = day if day else datetime.now().strftime("%Y-%m-%d")
+        return self._crawl_day
+
+    def record(self, url: str, html: str, tag: str = None) -> str:
+        """
+        Stores a fetched page in the archive, with the current crawl day (the day of the fetch if no crawl was
+        started)
+        :param url: URL of the page
+        :param html: HTML source of the page
+        :param tag: Tag to classify the page (optional)
+        :return: The content hash of the page
+        """
+        content = html.encode("UTF-8")
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            # Written to a temporary file first, so a crash never leaves a truncated object behind
+            descriptor, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self._objects_dir)
+            try:
+                with os.fdopen(descriptor, mode="wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                    f.write(content)
+                os.replace(temp_path, object_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        else:
+            self.logger.debug("Page %s already archived as %s", url, digest)
+
+        now = datetime.now()
+        entry = {
+            "TIMESTAMP": now.isoformat(timespec="seconds"),
+            "URL": url,
+            "SHA256": digest,
+            "TAG": tag or "",
+            "DAY": self._crawl_day or now.strftime("%Y-%m-%d"),
+        }
+        write_headers = not os.path.exists(self._index_path)
+        with open(self._index_path, mode="a", newline="", encoding="UTF-8") as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_HEADERS)
+            if write_headers:
+                writer.writeheader()
+            writer.writerow(entry)
+
+        if self._entries is not None and self._in_day(entry):
+            self._entries.append(entry)
+            self._by_url[url] = digest
+        return digest
+
+    def load(self, url: str) -> str:
+        """
+        Retrieves the latest archived version of a page
+        :param url: URL of the page
+        :return: HTML source of the page
+        :throws ArchivedPageNotFound: If the page is not in the archive
+        """
+        self._load_index()
+        digest = self._by_url.get(url)
+        if digest is None:
+            raise ArchivedPageNotFound(url, self.day)
+        return self._read_object(digest)
+
+    def tagged(self, tag: str) -> List[str]:
+        """
+        Retrieves the archived pages with a given tag, in the order they were recorded. Only the pages of the selected
+        crawl day are returned or, if there isn't one, the pages of the latest crawl day with that tag
+        :param tag: Tag of the pages
+        :return: List with the HTML source of the pages
+        """
+        self._load_index()
+        entries = [entry for entry in self._entries if entry["TAG"] == tag]
+        if self.day is None and entries:
+            latest = max(entry["DAY"] for entry in entries)
+            entries = [entry for entry in entries if entry["DAY"] == latest]
+        return [self._read_object(entry["SHA256"]) for entry in entries]
+
+    def _load_index(self) -> None:
+        """Reads the archive index into memory (only once)"""
+        if self._entries is not None:
+            return
+        self._entries = []
+        if os.path.exists(self._index_path):
+            with open(self._index_path, mode="r", newline="", encoding="UTF-8") as f:
+                self._entries = [entry for entry in csv.DictReader(f) if self._in_day(entry)]
+        # Later entries override earlier ones
+        self._by_url = {entry["URL"]: entry["SHA256"] for entry in self._entries}
+        self.logger.info("Loaded %s archived pages", len(self._entries))
+
+    def _upgrade_index(self) -> None:
+        """Adds the crawl day to an index written before it was recorded (the day of each fetch is used)"""
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, mode="r", newline="", encoding="UTF-8") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or "DAY" in reader.fieldnames:
+                return
+            entries = [{**entry, "DAY": entry["TIMESTAMP"][:10]} for entry in reader]
+
+        descriptor, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(descriptor, mode="w", newline="", encoding="UTF-8") as f:
+                writer = csv.DictWriter(f, fieldnames=INDEX_HEADERS)
+                writer.writeheader()
+                writer.writerows(entries)
+            os.replace(temp_path, self._index_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.logger.info("Added the crawl day to %s archived pages", len(entries))
+
+    def _in_day(self, entry: Dict[str, str]) -> bool:
+        """Checks if an index entry belongs to the selected crawl day"""
+        return self.day is None or entry["DAY"] == self.day
+
+    def _object_path(self, digest: str) -> str:
+        """Path of a stored page given its content hash"""
+        return os.path.join(self._objects_dir, digest + ".html.gz")
+
+    def _read_object(self, digest: str) -> str:
+        """Reads and decompresses a stored page"""
+        with gzip.open(self._object_path(digest), mode="rb") as f:
+            return f.read().decode("UTF-8")
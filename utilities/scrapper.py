@@ -5,6 +5,7 @@ from bs4 import BeautifulSoup
 
 from exceptions.browser import NullBrowserSession, BrowserNotSupported
 from utilities import Browser, start_selenium
+from utilities.archive import PageArchive
 
 
 class Scrapper:
@@ -17,12 +18,26 @@ class Scrapper:
         browser_args    (tuple): Arguments to pass to the browser when initialized
         browser_options (dict): Options for the browser when initialized
         browser         (WebDriver): Selenium driver
+        archive         (PageArchive): Archive where the fetched pages are recorded (optional)
+        replay          (bool): Whether the pages are read from the archive instead of the browser
     """
 
     __abstract__ = True
     logger = logging.getLogger("Default Scrapper")
 
-    def __init__(self, browser: Browser, arguments=("--headless", "--no-sandbox"), options=None) -> None:
+    def __init__(
+        self,
+        browser: Browser,
+        arguments=("--headless", "--no-sandbox"),
+        options=None,
+        archive: PageArchive = None,
+        replay: bool = False,
+    ) -> None:
+        if replay and archive is None:
+            raise ValueError("Replay mode needs a page archive")
+        # Archive
+        self.archive = archive
+        self.replay = replay
         # Browser
         self.browser_name = browser
         self.browser_args = arguments
@@ -30,18 +45,25 @@ class Scrapper:
         self.browser = None
         self.open()
 
-    def _get_page(self, url: str, load_time: int) -> BeautifulSoup:
+    def _get_page(self, url: str, load_time: int, tag: str = None) -> BeautifulSoup:
         """
         Gets HTML page and returns it as a BeautifulSoup object
         :param url: URL to get
         :param load_time: Time in seconds to wait for the page to load
+        :param tag: Tag to record the page with in the archive (optional)
         :return: BeautifulSoup object
         """
+        if self.replay:
+            self.logger.debug("Replaying page %s", url)
+            return BeautifulSoup(self.archive.load(url), features="html.parser")
+
         self.logger.info("Fetching page %s", url)
         if self.browser:
             self.browser.get(url)
             time.sleep(load_time)
             html = self.browser.page_source
+            if self.archive:
+                self.archive.record(url, html, tag)
             return BeautifulSoup(html, features="html.parser")
         else:
             self.logger.exception("No browser session")
@@ -49,6 +71,9 @@ class Scrapper:
 
     def open(self) -> None:
         """Initializes Selenium browser"""
+        if self.replay:
+            self.logger.info("Replay mode, browser not initialized")
+            return
         self.logger.info("Initializing browser: %s", self.browser_name)
         try:
             self.browser = start_selenium(self.browser_name, self.browser_args, self.browser_options)
@@ -56,13 +81,17 @@ class Scrapper:
             self.logger.exception("Browser not supported")
             raise
 
+    def reset(self) -> None:
+        """Clears the data of previous extractions, so the browser session can be reused"""
+        pass
+
     def close(self) -> None:
         """Explicitly close the browser session."""
         if self.browser:
             self.logger.info("Closing browser session")
             self.browser.quit()
             self.browser = None
-        else:
+        elif not self.replay:
             self.logger.warning("Trying to close a null browser session")
 
     def __enter__(self) -> "Scrapper":
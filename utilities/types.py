@@ -1,15 +1,15 @@
-from typing import Literal, Union
+from typing import TYPE_CHECKING, Literal, Union
 
-from selenium import webdriver
+if TYPE_CHECKING:  # Selenium is only imported when a browser is started
+    from selenium import webdriver
 
 Browser = Literal["chrome", "firefox", "edge", "internet explorer", "safari"]
 """ Supported browsers """
 
 WebDriver = Union[
-    webdriver.Chrome, webdriver.Firefox, webdriver.Edge, webdriver.Ie, webdriver.Safari
+    "webdriver.Chrome", "webdriver.Firefox", "webdriver.Edge", "webdriver.Ie", "webdriver.Safari"
 ]
 """ Supported selenium drivers """
 
-Options = Union[webdriver.ChromeOptions(), webdriver.FirefoxOptions()]
+Options = Union["webdriver.ChromeOptions", "webdriver.FirefoxOptions"]
 """ Supported webdriver options """
-
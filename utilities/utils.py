@@ -1,8 +1,6 @@
 import os
 from typing import Tuple, Dict
 
-from selenium import webdriver
-
 from exceptions.browser import BrowserNotSupported, BrowserOptionsNotSupported
 from utilities.types import Browser, WebDriver, Options
 
@@ -15,6 +13,8 @@ def start_selenium(browser: Browser, arguments: Tuple[str], browser_options: Dic
     :param browser_options: The options to pass to the browser (only for Chrome and Firefox)
     :return: A webdriver object for the given browser
     """
+    from selenium import webdriver
+
     match browser:
         case "chrome":
             options = webdriver.ChromeOptions()
@@ -53,6 +53,8 @@ def add_browser_options(options: Options, browser_options: Dict) -> None:
     :param options: Options instance
     :param browser_options: Browser options to add
     """
+    from selenium import webdriver
+
     match options:
         case webdriver.ChromeOptions():
             options.add_experimental_option("prefs", browser_options)
@@ -0,0 +1,22 @@
+"""
+Distributed crawl work queue module
+
+Classes:
+    WorkQueue: Abstract class for work queue backends
+
+    SQLiteQueue: Work queue stored in a SQLite database
+
+    Worker: Class responsible for running the tasks of a work queue
+
+    Task: Class containing a task leased from a work queue
+
+Functions:
+    enqueue_crawl: Adds the tasks of a full crawl to a work queue
+"""
+
+from .queue import WorkQueue
+from .sqlite import SQLiteQueue
+from .types import Task
+from .worker import Worker, enqueue_crawl
+
+__all__ = ["WorkQueue", "SQLiteQueue", "Task", "Worker", "enqueue_crawl"]
@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+
+from workqueue.types import Task
+
+
+class WorkQueue:
+    """
+    Abstract class for work queues.
+
+    A task is identified by its kind and payload, and is only added once: payloads should include something that tells
+    runs apart (e.g. a crawl id) for the task to be repeated later. Tasks are leased by a worker for a limited time.
+    The worker acknowledges the task when it's done, or releases it when it fails. Tasks whose lease expires (e.g. the
+    worker died) can be leased again by any worker, until they reach the maximum number of attempts.
+    """
+
+    __abstract__ = True
+
+    def put(self, kind: str, payload: Dict) -> None:
+        """
+        Adds a task to the queue. Tasks already added (even if done) are ignored
+        :param kind: Kind of task
+        :param payload: Arguments of the task
+        """
+        self.put_many(kind, [payload])
+
+    def put_many(self, kind: str, payloads: List[Dict]) -> None:
+        """
+        Adds several tasks of the same kind to the queue. Tasks already added (even if done) are ignored
+        :param kind: Kind of task
+        :param payloads: Arguments of each task
+        """
+        raise NotImplementedError
+
+    def lease(self, worker: str, lease_time: float, kinds: List[str] = None) -> Optional[Task]:
+        """
+        Leases the next available task
+        :param worker: Name of the worker
+        :param lease_time: Time in seconds until the lease expires
+        :param kinds: Kinds of tasks the worker accepts (all kinds by default)
+        :return: The leased task or None if there are no available tasks
+        """
+        raise NotImplementedError
+
+    def ack(self, task: Task) -> bool:
+        """
+        Marks a leased task as done
+        :param task: Leased task
+        :return: False if the lease was lost (expired and leased by another worker)
+        """
+        raise NotImplementedError
+
+    def release(self, task: Task) -> None:
+        """
+        Returns a failed task to the queue, or marks it as failed if it reached the maximum number of attempts
+        :param task: Leased task
+        """
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Counts the tasks in the queue by status
+        :return: Number of tasks by status ('pending', 'leased', 'done', 'failed')
+        """
+        raise NotImplementedError
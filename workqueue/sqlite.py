@@ -0,0 +1,138 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from workqueue.queue import WorkQueue
+from workqueue.types import Task
+from workqueue.vars import MAX_ATTEMPTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    UNIQUE (kind, payload)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+"""
+""" Database schema of the queue """
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Work queue stored in a SQLite database.
+
+    Any number of processes can share the queue as long as they can access the database file. It's meant for tests
+    and workers in the same host, since SQLite locking is not reliable over network file systems.
+
+    Attributes:
+        logger          (logging.Logger): logger instance for the class
+        path            (str): Path to the database file
+        max_attempts    (int): Number of times a task is leased before it's marked as failed
+    """
+
+    logger = logging.getLogger("SQLiteQueue")
+
+    def __init__(self, path: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def put_many(self, kind: str, payloads: List[Dict]) -> None:
+        rows = [(kind, json.dumps(payload, sort_keys=True)) for payload in payloads]
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tasks (kind, payload) VALUES (?, ?)", rows)
+            added = db.total_changes - before
+        self.logger.info("Added %s %s tasks (%s already queued)", added, kind, len(rows) - added)
+
+    def lease(self, worker: str, lease_time: float, kinds: List[str] = None) -> Optional[Task]:
+        now = time.time()
+        query = (
+            "SELECT id, kind, payload, attempts FROM tasks "
+            "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+        )
+        arguments = [now]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            arguments.extend(kinds)
+        query += " ORDER BY id LIMIT 1"
+
+        with self._transaction() as db:
+            # Expired tasks without attempts left
+            db.execute(
+                "UPDATE tasks SET status = 'failed', worker = NULL "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = db.execute(query, arguments).fetchone()
+            if row is None:
+                return None
+            task_id, kind, payload, attempts = row
+            lease_expires = now + lease_time
+            db.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = ? WHERE id = ?",
+                (worker, lease_expires, attempts + 1, task_id),
+            )
+        return Task(task_id, kind, json.loads(payload), attempts + 1, worker, lease_expires)
+
+    def ack(self, task: Task) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE tasks SET status = 'done' WHERE id = ? AND worker = ? AND status = 'leased'",
+                (task.id, task.worker),
+            )
+        if cursor.rowcount == 0:
+            self.logger.warning("Lease of task %s lost by %s", task.id, task.worker)
+            return False
+        return True
+
+    def release(self, task: Task) -> None:
+        status = "failed" if task.attempts >= self.max_attempts else "pending"
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (status, task.id, task.worker),
+            )
+        if status == "failed":
+            self.logger.error("Task %s failed after %s attempts", task.id, task.attempts)
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {"pending": 0, "leased": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Database connection of the current thread"""
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return self._local.connection
+
+    def _transaction(self) -> "_Transaction":
+        """Write transaction that locks the database until it ends"""
+        return _Transaction(self._connection())
+
+
+class _Transaction:
+    """Context manager for an immediate transaction (commits on success and rolls back on error)"""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class Task:
+    """
+    Class representing a task leased from a work queue
+
+    Attributes:
+        id (int): Identifier of the task in the queue
+        kind (str): Kind of task (see vars.py)
+        payload (Dict): Arguments of the task
+        attempts (int): Number of times the task has been leased
+        worker (str): Name of the worker holding the lease
+        lease_expires (float): Timestamp when the lease expires
+    """
+
+    id: int
+    kind: str
+    payload: Dict
+    attempts: int
+    worker: str
+    lease_expires: float
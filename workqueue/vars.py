@@ -0,0 +1,24 @@
+"""
+Global constants used in the module
+"""
+
+AIRBNB_RESULTS = "airbnb_results"
+""" Task kind: scrape an Airbnb search (results shard) and enqueue its listings """
+
+AIRBNB_LISTING = "airbnb_listing"
+""" Task kind: extract the data of an Airbnb listing """
+
+JA_ACTIVITY = "ja_activity"
+""" Task kind: download the JA registry of an activity """
+
+LISTING_SELECTORS = ["host_selector", "css_hostname", "css_permit"]
+""" Selectors checked by the results tasks and passed on to their listing tasks """
+
+LEASE_TIME = 15 * 60
+""" Default time in seconds a worker holds a task before it can be leased by another worker """
+
+MAX_ATTEMPTS = 3
+""" Default number of times a task is leased before it's marked as failed """
+
+IDLE_TIME = 10
+""" Time in seconds a worker waits when the queue is empty """
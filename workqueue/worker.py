@@ -0,0 +1,225 @@
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from airbnb import AirbnbScrapper
+from airbnb.vars import (
+    AIRBNB_URL,
+    CSS_NEXT_PAGE,
+    URL_SELECTOR,
+    CSS_LISTINGS,
+    CSS_PERMIT,
+    CSS_HOSTNAME,
+    HOST_SELECTOR,
+    CSV_HEADERS,
+)
+from history.vars import SNAPSHOT_SUFFIX
+from ja import JAScrapper
+from ja.vars import TOURIST_APARTMENTS, RURAL_HOMES, TOURIST_HOMES, RURAL_TOURIST_HOMES
+from utilities import Browser, PageArchive
+from workqueue.queue import WorkQueue
+from workqueue.types import Task
+from workqueue.vars import AIRBNB_RESULTS, AIRBNB_LISTING, JA_ACTIVITY, LEASE_TIME, IDLE_TIME, LISTING_SELECTORS
+
+
+class Worker:
+    """
+    Class responsible for running the tasks of a work queue.
+
+    The scrappers are opened when the first task that needs them is leased, and kept open until the worker is closed.
+
+    Attributes:
+        logger          (logging.Logger): logger instance for the class
+        queue           (WorkQueue): Queue to lease the tasks from
+        browser_name    (str): Name of the browser to use
+        name            (str): Name of the worker (hostname and process id by default)
+        kinds           (List[str]): Kinds of tasks handled by the worker
+        lease_time      (float): Time in seconds the worker holds a task
+        download_dir    (str): Directory where the JA excel files are downloaded
+        ja_options      (Dict): Browser options of the JA scrapper
+        archive         (PageArchive): Archive where the Airbnb pages are recorded (optional)
+        arguments       (Dict): Additional arguments for the scrapping functions (same as AirbnbScrapper.extract)
+    """
+
+    logger = logging.getLogger("Worker")
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        browser: Browser,
+        name: str = None,
+        kinds: List[str] = None,
+        lease_time: float = LEASE_TIME,
+        download_dir: str = None,
+        ja_options: Dict = None,
+        archive: PageArchive = None,
+        **kwargs,
+    ) -> None:
+        self.queue = queue
+        self.browser_name = browser
+        self.name = name if name else f"{socket.gethostname()}-{os.getpid()}"
+        self.kinds = kinds if kinds else [AIRBNB_RESULTS, AIRBNB_LISTING, JA_ACTIVITY]
+        self.lease_time = lease_time
+        self.download_dir = download_dir
+        self.ja_options = ja_options if ja_options else {}
+        self.archive = archive
+        self.arguments = kwargs
+        self._airbnb: AirbnbScrapper = None
+        self._ja: JAScrapper = None
+
+    def run(self, max_tasks: int = None, stop_when_empty: bool = False) -> int:
+        """
+        Leases and runs tasks from the queue
+        :param max_tasks: Maximum number of tasks to run (optional)
+        :param stop_when_empty: Whether to stop when there are no available tasks instead of waiting
+        :return: Number of tasks done
+        """
+        self.logger.info("Worker %s started", self.name)
+        done = 0
+        while max_tasks is None or done < max_tasks:
+            task = self.queue.lease(self.name, self.lease_time, self.kinds)
+            if task is None:
+                if stop_when_empty:
+                    break
+                time.sleep(IDLE_TIME)
+                continue
+            try:
+                self.handle(task)
+            except Exception:
+                self.logger.exception("Task %s (%s) failed", task.id, task.kind)
+                self.queue.release(task)
+            else:
+                if self.queue.ack(task):
+                    done += 1
+        self.logger.info("Worker %s finished %s tasks", self.name, done)
+        return done
+
+    def handle(self, task: Task) -> None:
+        """
+        Runs a task
+        :param task: Leased task
+        """
+        self.logger.info("Running task %s (%s): %s", task.id, task.kind, task.payload)
+        load_time = self.arguments.get('load_time', 8)
+        if task.kind == AIRBNB_RESULTS:
+            scrapper = self._airbnb_scrapper(task.payload.get('day'))
+            selectors = {
+                'css_listings': self.arguments.get('css_listings', CSS_LISTINGS),
+                'url_selector': self.arguments.get('url_selector', URL_SELECTOR),
+                'host_selector': self.arguments.get('host_selector', HOST_SELECTOR),
+                'css_hostname': self.arguments.get('css_hostname', CSS_HOSTNAME),
+                'css_permit': self.arguments.get('css_permit', CSS_PERMIT),
+            }
+            css_next_page = self.arguments.get('css_next_page', CSS_NEXT_PAGE)
+            health_check = self.arguments.get('health_check', True)
+            first_page = scrapper.first_results_page(task.payload['url'], load_time)
+            if health_check:
+                checked = scrapper.check_results_selectors(first_page, **self.arguments)
+                css_next_page = checked.pop('css_next_page')
+                selectors.update(checked)
+            scrapper.extract_soup(
+                task.payload['url'], load_time, self.arguments.get('click_time', 1), css_next_page, first_page
+            )
+            scrapper.scrape_listings_links(selectors['css_listings'], selectors['url_selector'])
+            if health_check:
+                selectors.update(scrapper.check_listing_selectors(scrapper.listings, **self.arguments))
+            # Canonical URLs, so a listing found by several shards is queued once per crawl
+            listings = scrapper.listings
+            self.queue.put_many(
+                AIRBNB_LISTING,
+                [
+                    {
+                        'url': listings.url(i),
+                        'filename': task.payload.get('filename'),
+                        'day': task.payload.get('day'),
+                        'crawl': task.payload.get('crawl'),
+                        'selectors': {name: selectors[name] for name in LISTING_SELECTORS},
+                    }
+                    for i in range(len(listings))
+                ],
+            )
+        elif task.kind == AIRBNB_LISTING:
+            scrapper = self._airbnb_scrapper(task.payload.get('day'))
+            selectors = task.payload.get('selectors', {})
+            scrapper.extract_listing_data(
+                load_time,
+                selectors.get('host_selector', self.arguments.get('host_selector', HOST_SELECTOR)),
+                selectors.get('css_hostname', self.arguments.get('css_hostname', CSS_HOSTNAME)),
+                selectors.get('css_permit', self.arguments.get('css_permit', CSS_PERMIT)),
+                listings=[task.payload['url']],
+            )
+            scrapper.to_csv(self.arguments.get('csv_headers', CSV_HEADERS), task.payload.get('filename'))
+        elif task.kind == JA_ACTIVITY:
+            scrapper = self._ja_scrapper()
+            scrapper.extract(activities=[task.payload['activity']], **self.arguments)
+        else:
+            raise ValueError(f"Unknown task kind '{task.kind}'")
+
+    def close(self) -> None:
+        """Closes the open scrappers"""
+        for scrapper in (self._airbnb, self._ja):
+            if scrapper is not None:
+                scrapper.close()
+        self._airbnb = None
+        self._ja = None
+
+    def _airbnb_scrapper(self, day: str = None) -> AirbnbScrapper:
+        """
+        Open Airbnb scrapper, cleared of previous tasks
+        :param day: Day of the crawl of the task, recorded with the archived pages (optional)
+        """
+        if self._airbnb is None:
+            self._airbnb = AirbnbScrapper(self.browser_name, archive=self.archive)
+        if self.archive is not None:
+            self.archive.start_crawl(day)
+        self._airbnb.reset()
+        return self._airbnb
+
+    def _ja_scrapper(self) -> JAScrapper:
+        """Open JA scrapper, cleared of previous tasks"""
+        if self._ja is None:
+            if self.download_dir is None:
+                raise ValueError("JA tasks need a download directory")
+            self._ja = JAScrapper(self.browser_name, self.ja_options, self.download_dir, ("--no-sandbox",))
+        self._ja.reset()
+        return self._ja
+
+    def __enter__(self) -> "Worker":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def enqueue_crawl(
+    queue: WorkQueue,
+    urls: List[str] = None,
+    activities: List[str] = None,
+    directory: str = ".",
+    crawl: str = None,
+) -> str:
+    """
+    Adds the tasks of a full crawl to a work queue. Every task carries the crawl id, so the tasks of a crawl are queued
+    only once while later crawls can repeat them. The listings of the crawl are saved in the snapshot of the day the
+    crawl was queued, whichever day the workers run the tasks
+    :param queue: Work queue
+    :param urls: Airbnb search URLs, one task for each (results shards)
+    :param activities: JA activities to download
+    :param directory: Directory of the listings csv files, as seen by the workers
+    :param crawl: Identifier of the crawl (the current time by default)
+    :return: The identifier of the crawl
+    """
+    urls = urls if urls else [AIRBNB_URL]
+    activities = activities if activities else [TOURIST_APARTMENTS, RURAL_HOMES, TOURIST_HOMES, RURAL_TOURIST_HOMES]
+    now = datetime.now()
+    crawl = crawl if crawl else now.isoformat(timespec="seconds")
+    day = now.strftime("%Y-%m-%d")
+    filename = os.path.join(directory, day + SNAPSHOT_SUFFIX)
+    queue.put_many(
+        AIRBNB_RESULTS, [{'url': url, 'filename': filename, 'day': day, 'crawl': crawl} for url in urls]
+    )
+    queue.put_many(JA_ACTIVITY, [{'activity': activity, 'crawl': crawl} for activity in activities])
+    return crawl